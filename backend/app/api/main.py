@@ -1,10 +1,16 @@
 from fastapi import APIRouter
 
+from app.api.routes import admin
 from app.api.routes import auth
+from app.api.routes import orders
+from app.api.routes import reservations
 from app.api.routes import sweets
 
 
 api_router = APIRouter(prefix="/api/v1")
 
 api_router.include_router(auth.router)
-api_router.include_router(sweets.router)
\ No newline at end of file
+api_router.include_router(sweets.router)
+api_router.include_router(orders.router)
+api_router.include_router(reservations.router)
+api_router.include_router(admin.router)
\ No newline at end of file
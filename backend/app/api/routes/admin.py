@@ -0,0 +1,58 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.api.routes.sweets import purchase_batcher
+from app.models.sweets import Sweet
+from app.models.user import User
+from app.core.catalog_index import catalog_index
+from app.core.config import get_settings
+from app.core.database import get_db
+from app.core.deps import get_current_admin_user
+from app.core.idempotency import idempotency_store
+from app.core.slow_queries import slow_query_log
+from app.core.singleflight import catalog_flight
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+@router.get("/metrics")
+def get_metrics(current_user: User = Depends(get_current_admin_user)):
+    return {
+        "catalog_singleflight": catalog_flight.stats(),
+        "idempotency": {"entries": len(idempotency_store)},
+        "purchase_write_behind": purchase_batcher.stats(),
+    }
+
+
+@router.get("/catalog-index")
+def check_catalog_index(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Compare the in-memory catalog index with the sweets table."""
+    ready = catalog_index is not None and catalog_index.ready
+    return {
+        "enabled": get_settings().catalog_index_enabled,
+        "ready": ready,
+        "rows": len(catalog_index) if ready else 0,
+        "mismatched_ids": catalog_index.diff(db.query(Sweet).all()) if ready else [],
+    }
+
+
+@router.get("/slow-queries")
+def get_slow_queries(
+    limit: int = Query(20, ge=1, le=500),
+    order_by: str = Query("total_ms", pattern="^(total_ms|mean_ms|max_ms|count)$"),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Slowest statement fingerprints seen by this process."""
+    return {
+        "threshold_ms": slow_query_log.threshold_ms,
+        "queries": slow_query_log.top(limit, order_by),
+    }
+
+
+@router.delete("/slow-queries")
+def reset_slow_queries(current_user: User = Depends(get_current_admin_user)):
+    slow_query_log.clear()
+    return {"message": "Slow query log cleared"}
@@ -1,15 +1,37 @@
+from datetime import datetime
+from typing import Optional
+
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
+from app.models.token import RefreshToken
 from app.models.user import User
-from app.schemas.user import UserCreate, UserLogin, UserResponse, Token
-from app.core.security import get_password_hash, verify_password, create_access_token
-from app.core.deps import get_current_user
+from app.schemas.user import RefreshTokenRequest, UserCreate, UserLogin, UserResponse, Token
+from app.core.revocation import revocation_list
+from app.core.security import (
+    create_access_token,
+    create_refresh_token,
+    get_password_hash,
+    hash_refresh_token,
+    verify_password,
+)
+from app.core.deps import get_current_user, get_token_claims
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
+def _issue_tokens(db: Session, user: User) -> dict:
+    access_token = create_access_token(
+        data={"sub": user.email, "uid": user.id, "adm": user.is_admin}
+    )
+    refresh_token, token_hash, expires_at = create_refresh_token()
+    db.add(RefreshToken(user_id=user.id, token_hash=token_hash, expires_at=expires_at))
+    db.commit()
+    
+    return {"access_token": access_token, "refresh_token": refresh_token, "token_type": "bearer"}
+
+
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 def register_user(user: UserCreate, db: Session = Depends(get_db)):
     existing_user = db.query(User).filter(User.email == user.email).first()
@@ -47,11 +69,78 @@ def login_user(user: UserLogin, db: Session = Depends(get_db)):
             detail="Incorrect email or password"
         )
     
-    access_token = create_access_token(data={"sub": db_user.email})
+    return _issue_tokens(db, db_user)
+
+
+@router.post("/refresh", response_model=Token)
+def refresh_access_token(request: RefreshTokenRequest, db: Session = Depends(get_db)):
+    stored = db.query(RefreshToken).filter(
+        RefreshToken.token_hash == hash_refresh_token(request.refresh_token)
+    ).first()
+    if stored is None or stored.expires_at <= datetime.utcnow():
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token"
+        )
+    
+    rotated = db.query(RefreshToken).filter(
+        RefreshToken.id == stored.id,
+        RefreshToken.revoked.is_(False)
+    ).update({"revoked": True})
+    if not rotated:
+        # A rotated token being presented again means it leaked; end every
+        # session of that user rather than guessing which copy is legitimate.
+        db.query(RefreshToken).filter(
+            RefreshToken.user_id == stored.user_id
+        ).update({"revoked": True})
+        db.commit()
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token"
+        )
+    
+    db_user = db.get(User, stored.user_id)
+    if db_user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found"
+        )
     
-    return {"access_token": access_token, "token_type": "bearer"}
+    return _issue_tokens(db, db_user)
+
+
+@router.post("/logout")
+def logout_user(
+    request: Optional[RefreshTokenRequest] = None,
+    claims: dict = Depends(get_token_claims),
+    db: Session = Depends(get_db)
+):
+    if "jti" in claims:
+        revocation_list.revoke(claims["jti"], claims["exp"])
+    
+    if request is not None:
+        # Tokens issued before user ids were embedded only carry the email.
+        user_id = claims.get("uid")
+        if user_id is None:
+            user_id = db.query(User.id).filter(User.email == claims["sub"]).scalar()
+        db.query(RefreshToken).filter(
+            RefreshToken.token_hash == hash_refresh_token(request.refresh_token),
+            RefreshToken.user_id == user_id
+        ).update({"revoked": True})
+        db.commit()
+    
+    return {"message": "Logged out successfully"}
 
 
 @router.get("/me", response_model=UserResponse)
-def get_current_user_info(current_user: User = Depends(get_current_user)):
-    return current_user
\ No newline at end of file
+def get_current_user_info(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    db_user = db.get(User, current_user.id)
+    if db_user is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    return db_user
@@ -0,0 +1,105 @@
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import insert, tuple_
+from sqlalchemy.orm import Session
+
+from app.core.database import get_db
+from app.core.deps import get_current_user
+from app.models.orders import Order, OrderLine
+from app.models.sweets import Sweet
+from app.models.user import User
+from app.schemas.orders import OrderPage
+
+router = APIRouter(prefix="/orders", tags=["orders"])
+
+
+def record_order(db: Session, user_id: int, items: Iterable[Tuple[Sweet, int]]) -> Order:
+    """Add an order and its lines to the current transaction.
+
+    The lines are written with a single executemany INSERT; committing is
+    left to the caller so the order lands together with the stock change.
+    """
+    items = list(items)
+    order = Order(
+        user_id=user_id,
+        created_at=datetime.utcnow(),
+        total=round(sum(sweet.price * quantity for sweet, quantity in items), 2)
+    )
+    db.add(order)
+    db.flush()
+    db.execute(insert(OrderLine), [
+        {
+            "order_id": order.id,
+            "sweet_id": sweet.id,
+            "sweet_name": sweet.name,
+            "unit_price": sweet.price,
+            "quantity": quantity,
+        }
+        for sweet, quantity in items
+    ])
+    return order
+
+
+def record_orders(db: Session, orders: List[Tuple[int, List[Tuple[Sweet, int]]]]):
+    """Add many ``(user_id, items)`` orders using one INSERT per table.
+
+    Order ids come back through RETURNING in parameter order, so the lines
+    of every order are written with a single executemany as well.
+    """
+    created_at = datetime.utcnow()
+    order_ids = db.execute(
+        insert(Order).returning(Order.id, sort_by_parameter_order=True),
+        [
+            {
+                "user_id": user_id,
+                "created_at": created_at,
+                "total": round(sum(sweet.price * quantity for sweet, quantity in items), 2),
+            }
+            for user_id, items in orders
+        ]
+    ).scalars().all()
+    db.execute(insert(OrderLine), [
+        {
+            "order_id": order_id,
+            "sweet_id": sweet.id,
+            "sweet_name": sweet.name,
+            "unit_price": sweet.price,
+            "quantity": quantity,
+        }
+        for order_id, (_, items) in zip(order_ids, orders)
+        for sweet, quantity in items
+    ])
+
+
+def _encode_cursor(order: Order) -> str:
+    return f"{order.created_at.isoformat()}_{order.id}"
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        created_at, order_id = cursor.rsplit("_", 1)
+        return datetime.fromisoformat(created_at), int(order_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+@router.get("", response_model=OrderPage)
+def get_orders(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    query = db.query(Order).filter(Order.user_id == current_user.id)
+    
+    if cursor:
+        query = query.filter(tuple_(Order.created_at, Order.id) < _decode_cursor(cursor))
+    
+    orders = query.order_by(Order.created_at.desc(), Order.id.desc()).limit(limit + 1).all()
+    next_cursor = _encode_cursor(orders[limit - 1]) if len(orders) > limit else None
+    return {"items": orders[:limit], "next_cursor": next_cursor}
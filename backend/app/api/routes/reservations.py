@@ -0,0 +1,138 @@
+from datetime import datetime, timezone
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.api.routes.orders import record_order
+from app.api.routes.sweets import catalog_changed, purchase_batcher
+from app.core.config import get_settings
+from app.core.database import get_db
+from app.core.deps import get_current_user
+from app.core.reservations import InsufficientStock, Reservation, reservation_manager
+from app.core.write_behind import SweetNotFound
+from app.models.sweets import Sweet
+from app.models.user import User
+from app.schemas.orders import OrderResponse
+from app.schemas.reservations import ReservationCreate, ReservationResponse
+from app.schemas.sweets import SweetResponse
+
+settings = get_settings()
+
+router = APIRouter(prefix="/reservations", tags=["reservations"])
+
+
+def _to_response(reservation: Reservation) -> ReservationResponse:
+    return ReservationResponse(
+        id=reservation.id,
+        sweet_id=reservation.sweet_id,
+        quantity=reservation.quantity,
+        expires_at=datetime.fromtimestamp(reservation.expires_at, tz=timezone.utc)
+    )
+
+
+def _reservation_not_found():
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail="Reservation not found"
+    )
+
+
+def _current_stock(db: Session, sweet_id: int) -> Optional[int]:
+    if settings.purchase_write_behind:
+        # Buffered purchases are not in the row yet.
+        try:
+            return purchase_batcher.available(sweet_id)
+        except SweetNotFound:
+            return None
+    return db.query(Sweet.quantity).filter(Sweet.id == sweet_id).scalar()
+
+
+@router.post("", response_model=ReservationResponse, status_code=status.HTTP_201_CREATED)
+def create_reservation(
+    reservation: ReservationCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    # Purchases take the same lock until their decrement is visible, so the
+    # stock read here cannot be spent between the read and the hold.
+    with reservation_manager.stock_lock(reservation.sweet_id):
+        stock = _current_stock(db, reservation.sweet_id)
+        if stock is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Sweet not found"
+            )
+        
+        try:
+            held = reservation_manager.reserve(
+                current_user.id,
+                reservation.sweet_id,
+                reservation.quantity,
+                reservation.ttl_seconds,
+                stock
+            )
+        except InsufficientStock:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Insufficient quantity in stock"
+            )
+    return _to_response(held)
+
+
+@router.get("/{reservation_id}", response_model=ReservationResponse)
+def get_reservation(
+    reservation_id: int,
+    current_user: User = Depends(get_current_user)
+):
+    reservation = reservation_manager.get(reservation_id, current_user.id)
+    if reservation is None:
+        raise _reservation_not_found()
+    return _to_response(reservation)
+
+
+@router.post("/{reservation_id}/confirm", response_model=OrderResponse)
+def confirm_reservation(
+    reservation_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    reservation = reservation_manager.claim(reservation_id, current_user.id)
+    if reservation is None:
+        raise _reservation_not_found()
+    
+    # The hold keeps counting against available stock until the decrement
+    # is committed, so concurrent purchases cannot take the reserved units.
+    try:
+        db_sweet = db.execute(
+            update(Sweet)
+            .where(Sweet.id == reservation.sweet_id, Sweet.quantity >= reservation.quantity)
+            .values(quantity=Sweet.quantity - reservation.quantity, version=Sweet.version + 1)
+            .returning(Sweet)
+        ).scalar_one_or_none()
+        if db_sweet is None:
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Insufficient quantity in stock"
+            )
+        
+        order = record_order(db, current_user.id, [(db_sweet, reservation.quantity)])
+        sweet = SweetResponse.model_validate(db_sweet)
+        result = OrderResponse.model_validate(order)
+        db.commit()
+        catalog_changed(sweet)
+        return result
+    finally:
+        reservation_manager.settle(reservation)
+
+
+@router.delete("/{reservation_id}", status_code=status.HTTP_200_OK)
+def release_reservation(
+    reservation_id: int,
+    current_user: User = Depends(get_current_user)
+):
+    if not reservation_manager.release(reservation_id, current_user.id):
+        raise _reservation_not_found()
+    return {"message": "Reservation released"}
@@ -1,86 +1,582 @@
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+import json
+from collections import defaultdict
+from datetime import datetime
+from decimal import Decimal
+from typing import Iterable, List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response, status, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import BigInteger, Numeric, case, cast, func, select, update
 from sqlalchemy.orm import Session
 
-from app.core.database import get_db
+from app.api.routes.orders import record_order, record_orders
+from app.core.config import get_settings
+from app.core.database import SessionLocal, get_db
 from app.models.user import User
-from app.schemas.sweets import QuantityUpdate, SweetCreate, SweetUpdate, SweetResponse
+from app.schemas.sweets import (
+    BulkRestock,
+    BulkRestockResult,
+    CategoryFacet,
+    PriceAdjustment,
+    PriceAdjustmentResult,
+    PriceBucket,
+    QuantityUpdate,
+    SearchFacets,
+    SweetBulkUpdate,
+    SweetCreate,
+    SweetUpdate,
+    SweetResponse,
+)
+from app.core.catalog import catalog_clock
+from app.core.catalog_index import catalog_index
 from app.core.deps import get_current_admin_user, get_current_user
+from app.core.idempotency import idempotency_store
+from app.core.pricing import apply_due_price_changes, price_at, record_price, record_prices
+from app.core.reservations import reservation_manager
+from app.core.singleflight import catalog_flight
+from app.core.write_behind import InsufficientStock, PurchaseBatcher, SweetNotFound
+from app.models.prices import PriceHistory
 from app.models.sweets import Sweet
+from app.schemas.prices import PriceAtResponse, PriceChangeCreate, PriceHistoryResponse
+
+settings = get_settings()
 
 router = APIRouter(prefix="/sweets", tags=["sweets"])
 
+# Rows per UPDATE in the bulk admin endpoints; keeps statements and their
+# RETURNING sets bounded on very large catalogs.
+BULK_CHUNK_SIZE = 500
+
+# Precision prices are compared at when bucketing facets.
+FACET_PRICE_DECIMALS = 6
+
+purchase_batcher = PurchaseBatcher(
+    SessionLocal,
+    flush_interval=settings.purchase_flush_interval_ms / 1000,
+    record_orders=record_orders
+)
+
+
+def _etag(version: int) -> str:
+    return f'"{version}"'
+
+
+def _parse_if_match(if_match: Optional[str]) -> Optional[int]:
+    if if_match is None or if_match.strip() == "*":
+        return None
+    try:
+        return int(if_match.strip().removeprefix("W/").strip('"'))
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="Invalid If-Match header"
+        )
+
+
+def catalog_changed(*sweets, deleted: Iterable[int] = (), from_batcher: bool = False):
+    """Propagate committed catalog writes to the in-process read paths.
+
+    ``sweets`` are snapshots of the rows as committed (anything with the
+    ``SweetResponse`` attributes) and ``deleted`` the ids that were removed.
+    """
+    for sweet in sweets:
+        if not from_batcher:
+            purchase_batcher.invalidate(sweet.id)
+        if catalog_index is not None:
+            catalog_index.upsert(sweet)
+    for sweet_id in deleted:
+        purchase_batcher.invalidate(sweet_id)
+        if catalog_index is not None:
+            catalog_index.remove(sweet_id)
+    # Last, so a read that sees the new generation also sees the new rows.
+    catalog_clock.touch()
+
+
+def refresh_catalog(db: Session, sweet_ids: List[int]):
+    """Reload committed rows that changed outside a handler, e.g. scheduled prices."""
+    if sweet_ids:
+        sweets = db.query(Sweet).filter(Sweet.id.in_(sweet_ids)).all()
+        catalog_changed(*(SweetResponse.model_validate(sweet) for sweet in sweets))
+
+
+def _catalog_index_ready() -> bool:
+    return settings.catalog_index_enabled and catalog_index is not None and catalog_index.ready
+
+
+def _conditional_read(request: Request, response: Response, handler):
+    """Answer a catalog read, or 304 if the client's copy is current.
+
+    ``handler`` receives the catalog generation the validators belong to.
+    Shared loads must include it in their single-flight key, so a request
+    never reuses a load that started before a write it has validators for.
+    """
+    generation, validators = catalog_clock.snapshot()
+    if catalog_clock.is_not_modified(request.headers, validators):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=validators)
+    
+    response.headers.update(validators)
+    return handler(generation)
+
+
+def _run_idempotent(
+    idempotency_key: Optional[str],
+    current_user: User,
+    operation: str,
+    payload: dict,
+    response: Response,
+    handler
+):
+    if idempotency_key is None:
+        return handler()
+    
+    body, replayed = idempotency_store.execute(
+        f"{current_user.id}:{operation}:{idempotency_key}", payload, handler
+    )
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    return body
+
+
+def _compare_and_swap(
+    db: Session,
+    sweet_id: int,
+    expected_version: Optional[int],
+    values: dict
+) -> Optional[Sweet]:
+    """Apply ``values`` and bump the version in a single UPDATE.
+
+    When ``expected_version`` is given the row is only touched if its
+    version still matches; ``None`` is returned if nothing was updated.
+    Price changes are also recorded in the price history.
+    """
+    statement = update(Sweet).where(Sweet.id == sweet_id)
+    if expected_version is not None:
+        statement = statement.where(Sweet.version == expected_version)
+    statement = statement.values(**values, version=Sweet.version + 1).returning(Sweet)
+    db_sweet = db.execute(statement).scalar_one_or_none()
+    if db_sweet is not None and "price" in values:
+        record_price(db, sweet_id, values["price"], datetime.utcnow(), applied=True)
+    return db_sweet
+
+
+def _raise_for_failed_swap(db: Session, sweet_ids: List[int]):
+    existing = {row.id for row in db.query(Sweet.id).filter(Sweet.id.in_(sweet_ids))}
+    if len(existing) < len(set(sweet_ids)):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Sweet not found"
+        )
+    raise HTTPException(
+        status_code=status.HTTP_412_PRECONDITION_FAILED,
+        detail=f"Sweet was modified concurrently: {', '.join(map(str, sorted(set(sweet_ids))))}"
+    )
+
 
 @router.post("", response_model=SweetResponse, status_code=status.HTTP_201_CREATED)
 def create_sweet(
     sweet: SweetCreate,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    db_sweet = Sweet(**sweet.model_dump())
-    db.add(db_sweet)
-    db.commit()
-    db.refresh(db_sweet)
-    return db_sweet
+    def create():
+        db_sweet = Sweet(**sweet.model_dump())
+        db.add(db_sweet)
+        db.flush()
+        record_price(db, db_sweet.id, db_sweet.price, datetime.utcnow(), applied=True)
+        db.commit()
+        db.refresh(db_sweet)
+        result = SweetResponse.model_validate(db_sweet)
+        catalog_changed(result)
+        return result
+    
+    result = _run_idempotent(
+        idempotency_key, current_user, "create", sweet.model_dump(), response, create
+    )
+    response.headers["ETag"] = _etag(result.version)
+    return result
 
 
 @router.get("", response_model=List[SweetResponse])
 def get_sweets(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    sweets = db.query(Sweet).all()
-    return sweets
+    def load(generation: int):
+        if _catalog_index_ready():
+            return catalog_index.all()
+        return catalog_flight.do(
+            ("all", generation),
+            lambda: [SweetResponse.model_validate(sweet) for sweet in db.query(Sweet).all()]
+        )
+    
+    return _conditional_read(request, response, load)
 
 
-@router.get("/search", response_model=List[SweetResponse])
-def search_sweets(
-    name: Optional[str] = Query(None),
-    category: Optional[str] = Query(None),
-    min_price: Optional[float] = Query(None, ge=0),
-    max_price: Optional[float] = Query(None, ge=0),
+@router.get("/export")
+def export_sweets(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    query = db.query(Sweet)
+    def rows():
+        for sweet in db.query(Sweet).order_by(Sweet.id).yield_per(500):
+            yield json.dumps(SweetResponse.model_validate(sweet).model_dump()) + "\n"
     
+    return StreamingResponse(rows(), media_type="application/x-ndjson")
+
+
+def _filter_sweets(
+    query,
+    name: Optional[str],
+    category: Optional[str],
+    min_price: Optional[float],
+    max_price: Optional[float],
+    price_at_time: Optional[datetime]
+):
+    """Apply the search filters and return the query with its price expression."""
     if name:
         query = query.filter(Sweet.name.ilike(f"%{name}%"))
     
     if category:
         query = query.filter(Sweet.category.ilike(f"%{category}%"))
     
+    price = Sweet.price
+    if price_at_time is not None:
+        condition, price = price_at(price_at_time)
+        query = query.outerjoin(PriceHistory, condition)
+    
     if min_price is not None:
-        query = query.filter(Sweet.price >= min_price)
+        query = query.filter(price >= min_price)
     
     if max_price is not None:
-        query = query.filter(Sweet.price <= max_price)
+        query = query.filter(price <= max_price)
+    
+    return query, price
+
+
+def compute_facets(query, price, bucket_size: float) -> SearchFacets:
+    """Category counts and a price histogram for ``query`` in one GROUP BY."""
+    # Buckets are computed on prices and bucket size scaled to integers, so
+    # a price on a boundary (0.3 with 0.1 buckets) is not pushed one bucket
+    # down by float error. Prices are positive, so integer division floors.
+    # Bounds are rounded to the bucket size's own precision, so 0.1 buckets
+    # end at 2.9 rather than 2.9000000000000004.
+    decimals = max(-Decimal(str(bucket_size)).as_tuple().exponent, 0)
+    scale = 10 ** max(decimals, FACET_PRICE_DECIMALS)
+    scaled_size = round(bucket_size * scale)
+    bucket = cast(func.round(price * scale), BigInteger) // scaled_size
+    rows = query.with_entities(
+        Sweet.category, bucket.label("bucket"), func.count()
+    ).group_by(Sweet.category, bucket).all()
+    
+    categories = defaultdict(int)
+    buckets = defaultdict(int)
+    for row_category, row_bucket, count in rows:
+        categories[row_category] += count
+        buckets[int(row_bucket)] += count
+    
+    return SearchFacets(
+        total=sum(categories.values()),
+        categories=[
+            CategoryFacet(category=key, count=count)
+            for key, count in sorted(categories.items(), key=lambda item: (-item[1], item[0]))
+        ],
+        price_buckets=[
+            PriceBucket(
+                min_price=round(key * bucket_size, decimals),
+                max_price=round((key + 1) * bucket_size, decimals),
+                count=count
+            )
+            for key, count in sorted(buckets.items())
+        ]
+    )
+
+
+@router.get("/search", response_model=List[SweetResponse])
+def search_sweets(
+    request: Request,
+    response: Response,
+    name: Optional[str] = Query(None),
+    category: Optional[str] = Query(None),
+    min_price: Optional[float] = Query(None, ge=0),
+    max_price: Optional[float] = Query(None, ge=0),
+    price_at_time: Optional[datetime] = Query(None, alias="price_at"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    name = name.lower() if name else None
+    category = category.lower() if category else None
     
-    sweets = query.all()
-    return sweets
+    def search():
+        query, _ = _filter_sweets(
+            db.query(Sweet), name, category, min_price, max_price, price_at_time
+        )
+        return [SweetResponse.model_validate(sweet) for sweet in query.all()]
+    
+    def load(generation: int):
+        if _catalog_index_ready() and price_at_time is None:
+            return catalog_index.search(name, category, min_price, max_price)
+        return catalog_flight.do(
+            ("search", generation, name, category, min_price, max_price, price_at_time), search
+        )
+    
+    return _conditional_read(request, response, load)
+
+
+@router.get("/search/facets", response_model=SearchFacets)
+def search_facets(
+    request: Request,
+    response: Response,
+    name: Optional[str] = Query(None),
+    category: Optional[str] = Query(None),
+    min_price: Optional[float] = Query(None, ge=0),
+    max_price: Optional[float] = Query(None, ge=0),
+    price_at_time: Optional[datetime] = Query(None, alias="price_at"),
+    bucket_size: float = Query(1.0, gt=0),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    name = name.lower() if name else None
+    category = category.lower() if category else None
+    
+    def facets():
+        query, price = _filter_sweets(
+            db.query(Sweet), name, category, min_price, max_price, price_at_time
+        )
+        return compute_facets(query, price, bucket_size)
+    
+    return _conditional_read(
+        request,
+        response,
+        lambda generation: catalog_flight.do(
+            (
+                "facets", generation, name, category, min_price, max_price, price_at_time,
+                bucket_size
+            ),
+            facets
+        )
+    )
+
+
+@router.patch("", response_model=List[SweetResponse])
+def bulk_update_sweets(
+    sweet_updates: List[SweetBulkUpdate],
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    updated = []
+    failed = []
+    for sweet_update in sweet_updates:
+        update_data = sweet_update.model_dump(exclude_unset=True, exclude={"id", "version"})
+        db_sweet = _compare_and_swap(db, sweet_update.id, sweet_update.version, update_data)
+        if db_sweet is None:
+            failed.append(sweet_update.id)
+        else:
+            updated.append(SweetResponse.model_validate(db_sweet))
+    
+    if failed:
+        db.rollback()
+        _raise_for_failed_swap(db, failed)
+    
+    db.commit()
+    catalog_changed(*updated)
+    return updated
+
+
+@router.post("/restock", response_model=BulkRestockResult)
+def bulk_restock_sweets(
+    restock: BulkRestock,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Add stock to many sweets with one UPDATE per chunk of ids."""
+    def bulk_restock():
+        deltas = defaultdict(int)
+        for item in restock.items:
+            deltas[item.sweet_id] += item.quantity
+        
+        sweet_ids = sorted(deltas)
+        updated = []
+        for start in range(0, len(sweet_ids), BULK_CHUNK_SIZE):
+            chunk = sweet_ids[start:start + BULK_CHUNK_SIZE]
+            delta = case({sweet_id: deltas[sweet_id] for sweet_id in chunk}, value=Sweet.id)
+            statement = (
+                update(Sweet)
+                .where(Sweet.id.in_(chunk))
+                .values(quantity=Sweet.quantity + delta, version=Sweet.version + 1)
+                .returning(Sweet)
+            )
+            updated.extend(
+                SweetResponse.model_validate(sweet) for sweet in db.execute(statement).scalars()
+            )
+        
+        db.commit()
+        catalog_changed(*updated)
+        found = {sweet.id for sweet in updated}
+        return BulkRestockResult(
+            updated=len(updated),
+            not_found=[sweet_id for sweet_id in sweet_ids if sweet_id not in found]
+        )
+    
+    return _run_idempotent(
+        idempotency_key, current_user, "bulk-restock", restock.model_dump(), response, bulk_restock
+    )
+
+
+@router.post("/prices", response_model=PriceAdjustmentResult)
+def adjust_prices(
+    adjustment: PriceAdjustment,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Change prices by percentage or amount for every sweet matching a filter.
+
+    Matching rows are updated in id order, one UPDATE ... RETURNING per
+    chunk, all in one transaction. Rows whose price would drop to zero or
+    below are left unchanged and counted as skipped.
+    """
+    def adjust():
+        conditions = []
+        if adjustment.sweet_ids is not None:
+            conditions.append(Sweet.id.in_(adjustment.sweet_ids))
+        if adjustment.category:
+            conditions.append(func.lower(Sweet.category) == adjustment.category.lower())
+        if adjustment.name:
+            conditions.append(Sweet.name.ilike(f"%{adjustment.name}%"))
+        if adjustment.min_price is not None:
+            conditions.append(Sweet.price >= adjustment.min_price)
+        if adjustment.max_price is not None:
+            conditions.append(Sweet.price <= adjustment.max_price)
+        
+        if adjustment.percent is not None:
+            new_price = Sweet.price * (1 + adjustment.percent / 100)
+        else:
+            new_price = Sweet.price + adjustment.amount
+        new_price = func.round(cast(new_price, Numeric), 2)
+        
+        skipped = db.query(func.count(Sweet.id)).filter(*conditions, new_price <= 0).scalar()
+        
+        now = datetime.utcnow()
+        updated = []
+        last_id = 0
+        while True:
+            chunk = (
+                select(Sweet.id)
+                .where(*conditions, new_price > 0, Sweet.id > last_id)
+                .order_by(Sweet.id)
+                .limit(BULK_CHUNK_SIZE)
+                .correlate(None)
+            )
+            statement = (
+                update(Sweet)
+                .where(Sweet.id.in_(chunk))
+                .values(price=new_price, version=Sweet.version + 1)
+                .returning(Sweet)
+                .execution_options(synchronize_session=False)
+            )
+            rows = [
+                SweetResponse.model_validate(sweet) for sweet in db.execute(statement).scalars()
+            ]
+            if not rows:
+                break
+            record_prices(db, {sweet.id: sweet.price for sweet in rows}, now, applied=True)
+            updated.extend(rows)
+            last_id = max(sweet.id for sweet in rows)
+        
+        db.commit()
+        catalog_changed(*updated)
+        return PriceAdjustmentResult(updated=len(updated), skipped=skipped)
+    
+    return _run_idempotent(
+        idempotency_key, current_user, "adjust-prices", adjustment.model_dump(), response, adjust
+    )
 
 
 @router.put("/{sweet_id}", response_model=SweetResponse)
 def update_sweet(
     sweet_id: int,
     sweet_update: SweetUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    db_sweet = db.query(Sweet).filter(Sweet.id == sweet_id).first()
-    if not db_sweet:
+    expected_version = _parse_if_match(if_match)
+    update_data = sweet_update.model_dump(exclude_unset=True)
+    db_sweet = _compare_and_swap(db, sweet_id, expected_version, update_data)
+    if db_sweet is None:
+        db.rollback()
+        _raise_for_failed_swap(db, [sweet_id])
+    
+    result = SweetResponse.model_validate(db_sweet)
+    db.commit()
+    catalog_changed(result)
+    response.headers["ETag"] = _etag(result.version)
+    return result
+
+
+@router.get("/{sweet_id}/prices", response_model=List[PriceHistoryResponse])
+def get_price_history(
+    sweet_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    return db.query(PriceHistory).filter(
+        PriceHistory.sweet_id == sweet_id
+    ).order_by(PriceHistory.effective_from).all()
+
+
+@router.get("/{sweet_id}/price", response_model=PriceAtResponse)
+def get_price_at(
+    sweet_id: int,
+    at: datetime = Query(...),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    condition, price = price_at(at)
+    result = db.execute(
+        select(price)
+        .select_from(Sweet)
+        .outerjoin(PriceHistory, condition)
+        .where(Sweet.id == sweet_id)
+    ).scalar_one_or_none()
+    if result is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Sweet not found"
+        )
+    return {"sweet_id": sweet_id, "price": result, "at": at}
+
+
+@router.post(
+    "/{sweet_id}/prices",
+    response_model=PriceHistoryResponse,
+    status_code=status.HTTP_201_CREATED
+)
+def schedule_price_change(
+    sweet_id: int,
+    price_change: PriceChangeCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    if db.query(Sweet.id).filter(Sweet.id == sweet_id).first() is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Sweet not found"
         )
     
-    update_data = sweet_update.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(db_sweet, field, value)
-    
+    entry = record_price(db, sweet_id, price_change.price, price_change.effective_from)
     db.commit()
-    db.refresh(db_sweet)
-    return db_sweet
+    if entry.effective_from <= datetime.utcnow():
+        refresh_catalog(db, apply_due_price_changes(db))
+    db.refresh(entry)
+    return entry
 
 
 @router.delete("/{sweet_id}", status_code=status.HTTP_200_OK)
@@ -98,6 +594,7 @@ def delete_sweet(
     
     db.delete(db_sweet)
     db.commit()
+    catalog_changed(deleted=[sweet_id])
     return {"message": "Sweet deleted successfully"}
 
 
@@ -105,43 +602,111 @@ def delete_sweet(
 def purchase_sweet(
     sweet_id: int,
     quantity: QuantityUpdate,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    db_sweet = db.query(Sweet).filter(Sweet.id == sweet_id).first()
-    if not db_sweet:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Sweet not found"
-        )
+    def purchase_write_behind():
+        try:
+            # The buffered decrement is visible to reservations through
+            # ``purchase_batcher.available`` as soon as it is queued.
+            with reservation_manager.stock_lock(sweet_id):
+                pending = purchase_batcher.enqueue(
+                    current_user.id,
+                    sweet_id,
+                    quantity.quantity,
+                    held=reservation_manager.held(sweet_id)
+                )
+            snapshot = purchase_batcher.wait(pending)
+        except SweetNotFound:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Sweet not found"
+            )
+        except InsufficientStock:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Insufficient quantity in stock"
+            )
+        result = SweetResponse.model_validate(snapshot)
+        catalog_changed(result, from_batcher=True)
+        return result
     
-    if db_sweet.quantity < quantity.quantity:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Insufficient quantity in stock"
-        )
+    def purchase():
+        # Stock held by checkout reservations is not available for purchase.
+        # The stock lock keeps new holds out until the decrement is committed.
+        with reservation_manager.stock_lock(sweet_id):
+            held = reservation_manager.held(sweet_id)
+            db_sweet = db.execute(
+                update(Sweet)
+                .where(Sweet.id == sweet_id, Sweet.quantity - held >= quantity.quantity)
+                .values(quantity=Sweet.quantity - quantity.quantity, version=Sweet.version + 1)
+                .returning(Sweet)
+            ).scalar_one_or_none()
+            if db_sweet is None:
+                db.rollback()
+                if db.query(Sweet.id).filter(Sweet.id == sweet_id).first() is None:
+                    raise HTTPException(
+                        status_code=status.HTTP_404_NOT_FOUND,
+                        detail="Sweet not found"
+                    )
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Insufficient quantity in stock"
+                )
+            
+            record_order(db, current_user.id, [(db_sweet, quantity.quantity)])
+            result = SweetResponse.model_validate(db_sweet)
+            db.commit()
+        catalog_changed(result)
+        return result
     
-    db_sweet.quantity -= quantity.quantity
-    db.commit()
-    db.refresh(db_sweet)
-    return db_sweet
+    return _run_idempotent(
+        idempotency_key,
+        current_user,
+        f"purchase:{sweet_id}",
+        quantity.model_dump(),
+        response,
+        purchase_write_behind if settings.purchase_write_behind else purchase
+    )
 
 
 @router.post("/{sweet_id}/restock", response_model=SweetResponse)
 def restock_sweet(
     sweet_id: int,
     quantity: QuantityUpdate,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_admin_user)
 ):
-    db_sweet = db.query(Sweet).filter(Sweet.id == sweet_id).first()
-    if not db_sweet:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Sweet not found"
-        )
+    def restock():
+        # One UPDATE, so writes committed since any earlier read are kept.
+        db_sweet = db.execute(
+            update(Sweet)
+            .where(Sweet.id == sweet_id)
+            .values(quantity=Sweet.quantity + quantity.quantity, version=Sweet.version + 1)
+            .returning(Sweet)
+            .execution_options(populate_existing=True)
+        ).scalar_one_or_none()
+        if db_sweet is None:
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Sweet not found"
+            )
+        
+        result = SweetResponse.model_validate(db_sweet)
+        db.commit()
+        catalog_changed(result)
+        return result
     
-    db_sweet.quantity += quantity.quantity
-    db.commit()
-    db.refresh(db_sweet)
-    return db_sweet
\ No newline at end of file
+    return _run_idempotent(
+        idempotency_key,
+        current_user,
+        f"restock:{sweet_id}",
+        quantity.model_dump(),
+        response,
+        restock
+    )
@@ -0,0 +1,74 @@
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Callable, Dict, Tuple
+
+from starlette.datastructures import Headers
+
+
+class CatalogClock:
+    """Tracks when the sweets catalog last changed in this process.
+
+    Write handlers call ``touch`` after committing; read handlers derive
+    their ``ETag``/``Last-Modified`` validators from it and can answer
+    conditional requests with 304 before querying the database. The ETag
+    embeds a per-process epoch so a restart invalidates old validators.
+    ``Last-Modified`` has whole-second resolution, so it is only sent once
+    the last write is a full second old: a later write then always lands in
+    a later second than any date a client can hold.
+    Validators are per process, which matches the single uvicorn worker
+    the application is deployed with.
+    """
+
+    def __init__(self, clock: Callable[[], datetime] = lambda: datetime.now(timezone.utc)):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._epoch = uuid.uuid4().hex[:8]
+        self._generation = 0
+        self._last_modified = self._clock()
+
+    def touch(self):
+        with self._lock:
+            self._generation += 1
+            self._last_modified = self._clock()
+
+    def snapshot(self) -> Tuple[int, Dict[str, str]]:
+        """The current generation together with the validators derived from it."""
+        with self._lock:
+            generation, last_modified = self._generation, self._last_modified
+        validators = {
+            "ETag": f'W/"catalog-{self._epoch}-{generation}"',
+            "Cache-Control": "private, no-cache",
+        }
+        if self._clock() - last_modified >= timedelta(seconds=1):
+            validators["Last-Modified"] = format_datetime(
+                last_modified.replace(microsecond=0), usegmt=True
+            )
+        return generation, validators
+
+    def headers(self) -> Dict[str, str]:
+        return self.snapshot()[1]
+
+    def is_not_modified(self, request_headers: Headers, validators: Dict[str, str]) -> bool:
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match is not None:
+            tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+            return "*" in tags or validators["ETag"].removeprefix("W/") in tags
+        
+        if_modified_since = request_headers.get("if-modified-since")
+        if if_modified_since is not None and "Last-Modified" in validators:
+            try:
+                since = parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+            if since is None:
+                return False
+            if since.tzinfo is None:
+                since = since.replace(tzinfo=timezone.utc)
+            return parsedate_to_datetime(validators["Last-Modified"]) <= since
+        
+        return False
+
+
+catalog_clock = CatalogClock()
@@ -0,0 +1,242 @@
+import threading
+from types import SimpleNamespace
+from typing import Dict, Iterable, List, Optional, Set
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def trigrams(text: str) -> Set[str]:
+    return {text[index:index + 3] for index in range(len(text) - 2)}
+
+
+class CatalogIndex:
+    """Columnar in-memory copy of the sweets table for filtering without SQL.
+
+    ``id``, ``price``, ``quantity`` and ``version`` live in NumPy arrays,
+    categories are dictionary-encoded into integer codes and lowercase
+    names are indexed by trigram. Name, category and price-range filters
+    are answered with vectorised boolean masks, matching the semantics of
+    the SQL search (case-insensitive substring matches, inclusive price
+    bounds). Rows are appended and tombstoned on delete; the arrays are
+    compacted once more than half of them are dead.
+
+    The index is filled by ``rebuild`` at startup and kept current by the
+    write handlers through ``upsert``/``remove``. It only sees writes made
+    by this process. Until ``rebuild`` runs it is not ``ready`` and
+    ignores updates. Every write bumps a sweet's version, so ``upsert``
+    drops snapshots older than the row it already has.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        if np is None:
+            raise RuntimeError("The catalog index requires numpy")
+        self._lock = threading.RLock()
+        self._capacity = capacity
+        self.ready = False
+        self._reset(capacity)
+
+    def _reset(self, capacity: int):
+        self._size = 0
+        self._ids = np.zeros(capacity, dtype=np.int64)
+        self._prices = np.zeros(capacity, dtype=np.float64)
+        self._quantities = np.zeros(capacity, dtype=np.int64)
+        self._versions = np.zeros(capacity, dtype=np.int64)
+        self._category_codes = np.zeros(capacity, dtype=np.int32)
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._names: List[str] = []
+        self._lower_names: List[str] = []
+        self._categories: List[str] = []
+        self._category_codes_by_name: Dict[str, int] = {}
+        self._row_of: Dict[int, int] = {}
+        self._trigrams: Dict[str, Set[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._row_of)
+
+    def rebuild(self, sweets: Iterable):
+        sweets = list(sweets)
+        with self._lock:
+            self._reset(max(self._capacity, 2 * len(sweets)))
+            for sweet in sweets:
+                self._append(sweet)
+            self.ready = True
+
+    def clear(self):
+        with self._lock:
+            self._reset(self._capacity)
+            self.ready = False
+
+    def upsert(self, sweet):
+        with self._lock:
+            if not self.ready:
+                return
+            row = self._row_of.get(sweet.id)
+            if row is None:
+                self._append(sweet)
+                return
+            # Snapshots can arrive out of order once the handlers have
+            # committed; an older version never replaces a newer one.
+            if sweet.version < self._versions[row]:
+                return
+            if self._names[row] != sweet.name:
+                self._unindex_name(row)
+                self._names[row] = sweet.name
+                self._lower_names[row] = sweet.name.lower()
+                self._index_name(row)
+            self._prices[row] = sweet.price
+            self._quantities[row] = sweet.quantity
+            self._versions[row] = sweet.version
+            self._category_codes[row] = self._category_code(sweet.category)
+
+    def remove(self, sweet_id: int):
+        with self._lock:
+            if not self.ready:
+                return
+            row = self._row_of.pop(sweet_id, None)
+            if row is None:
+                return
+            self._alive[row] = False
+            self._unindex_name(row)
+            if self._size > self._capacity and len(self._row_of) < self._size // 2:
+                self._compact()
+
+    def search(
+        self,
+        name: Optional[str] = None,
+        category: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None
+    ) -> List[dict]:
+        """Return matching rows as dicts ordered by id."""
+        with self._lock:
+            size = self._size
+            mask = self._alive[:size].copy()
+            
+            if name:
+                mask &= self._name_mask(name.lower(), size)
+            
+            if category:
+                needle = category.lower()
+                codes = [
+                    code for value, code in self._category_codes_by_name.items()
+                    if needle in value.lower()
+                ]
+                mask &= np.isin(self._category_codes[:size], codes)
+            
+            if min_price is not None:
+                mask &= self._prices[:size] >= min_price
+            
+            if max_price is not None:
+                mask &= self._prices[:size] <= max_price
+            
+            rows = np.flatnonzero(mask)
+            rows = rows[np.argsort(self._ids[rows], kind="stable")]
+            return [self._row(row) for row in rows]
+
+    def all(self) -> List[dict]:
+        return self.search()
+
+    def diff(self, sweets: Iterable) -> List[int]:
+        """Ids whose row in ``sweets`` (the SQL truth) differs from the index."""
+        with self._lock:
+            expected = {
+                sweet.id: {
+                    "id": sweet.id,
+                    "name": sweet.name,
+                    "category": sweet.category,
+                    "price": sweet.price,
+                    "quantity": sweet.quantity,
+                    "version": sweet.version,
+                }
+                for sweet in sweets
+            }
+            actual = {row["id"]: row for row in self.all()}
+            return sorted(
+                sweet_id for sweet_id in expected.keys() | actual.keys()
+                if expected.get(sweet_id) != actual.get(sweet_id)
+            )
+
+    def _row(self, row: int) -> dict:
+        return {
+            "id": int(self._ids[row]),
+            "name": self._names[row],
+            "category": self._categories[self._category_codes[row]],
+            "price": float(self._prices[row]),
+            "quantity": int(self._quantities[row]),
+            "version": int(self._versions[row]),
+        }
+
+    def _name_mask(self, needle: str, size: int):
+        if len(needle) < 3:
+            return np.fromiter(
+                (needle in name for name in self._lower_names[:size]), dtype=bool, count=size
+            )
+        
+        # Every substring of length >= 3 contains all of its trigrams, so the
+        # intersection of their postings is a superset of the matches.
+        mask = np.zeros(size, dtype=bool)
+        postings = sorted(
+            (self._trigrams.get(trigram, set()) for trigram in trigrams(needle)), key=len
+        )
+        candidates = set.intersection(*postings) if postings[0] else ()
+        for row in candidates:
+            if needle in self._lower_names[row]:
+                mask[row] = True
+        return mask
+
+    def _category_code(self, category: str) -> int:
+        code = self._category_codes_by_name.get(category)
+        if code is None:
+            code = len(self._categories)
+            self._categories.append(category)
+            self._category_codes_by_name[category] = code
+        return code
+
+    def _append(self, sweet):
+        if self._size == len(self._ids):
+            self._grow()
+        row = self._size
+        self._size += 1
+        self._ids[row] = sweet.id
+        self._prices[row] = sweet.price
+        self._quantities[row] = sweet.quantity
+        self._versions[row] = sweet.version
+        self._category_codes[row] = self._category_code(sweet.category)
+        self._alive[row] = True
+        self._names.append(sweet.name)
+        self._lower_names.append(sweet.name.lower())
+        self._row_of[sweet.id] = row
+        self._index_name(row)
+
+    def _grow(self):
+        capacity = 2 * len(self._ids)
+        attributes = ("_ids", "_prices", "_quantities", "_versions", "_category_codes", "_alive")
+        for attribute in attributes:
+            current = getattr(self, attribute)
+            grown = np.zeros(capacity, dtype=current.dtype)
+            grown[:len(current)] = current
+            setattr(self, attribute, grown)
+
+    def _compact(self):
+        live = [self._row(row) for row in np.flatnonzero(self._alive[:self._size])]
+        self._reset(max(self._capacity, 2 * len(live)))
+        for row in live:
+            self._append(SimpleNamespace(**row))
+
+    def _index_name(self, row: int):
+        for trigram in trigrams(self._lower_names[row]):
+            self._trigrams.setdefault(trigram, set()).add(row)
+
+    def _unindex_name(self, row: int):
+        for trigram in trigrams(self._lower_names[row]):
+            postings = self._trigrams.get(trigram)
+            if postings is not None:
+                postings.discard(row)
+                if not postings:
+                    del self._trigrams[trigram]
+
+
+catalog_index = CatalogIndex() if np is not None else None
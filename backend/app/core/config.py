@@ -9,10 +9,33 @@ class Settings(BaseSettings):
     secret_key: str = os.getenv("SECRET_KEY")
     algorithm: str = os.getenv("ALGORITHM")
     access_token_expire_minutes: int = os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES")
+    refresh_token_expire_days: int = 7
     
     app_name: str = os.getenv("APP_NAME")
     debug: bool = os.getenv("DEBUG")
     
+    idempotency_ttl_seconds: int = 86400
+    idempotency_max_entries: int = 10000
+    
+    compression_minimum_size: int = 500
+    
+    purchase_write_behind: bool = False
+    purchase_flush_interval_ms: int = 5
+    
+    price_scheduler_interval_seconds: int = 30
+    
+    catalog_index_enabled: bool = False
+    
+    tracing_enabled: bool = False
+    tracing_sample_rate: float = 1.0
+    tracing_exporter: str = "console"
+    tracing_file_path: str = "traces.jsonl"
+    
+    slow_query_log_enabled: bool = True
+    slow_query_threshold_ms: int = 200
+    slow_query_explain_sample_rate: float = 0.1
+    slow_query_max_fingerprints: int = 500
+    
     class Config:
         env_file = ".env"
         case_sensitive = False
@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
@@ -11,6 +11,12 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
+# Columns added to tables that existing databases already have. create_all
+# only creates missing tables, so these are added by ``upgrade_schema``.
+ADDED_COLUMNS = [
+    ("sweets", "version", "INTEGER NOT NULL DEFAULT 1"),
+]
+
 
 def get_db():
     db = SessionLocal()
@@ -21,4 +27,14 @@ def get_db():
 
 
 def create_tables():
-    Base.metadata.create_all(bind=engine)
\ No newline at end of file
+    Base.metadata.create_all(bind=engine)
+    upgrade_schema()
+
+
+def upgrade_schema(bind=engine):
+    inspector = inspect(bind)
+    with bind.begin() as conn:
+        for table, column, definition in ADDED_COLUMNS:
+            existing = {info["name"] for info in inspector.get_columns(table)}
+            if column not in existing:
+                conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {definition}"))
@@ -4,15 +4,17 @@ from sqlalchemy.orm import Session
 
 from app.core.database import get_db
 from app.models.user import User
+from app.core.revocation import revocation_list
 from app.core.security import decode_access_token
+from app.core.tracing import traced
 
 security = HTTPBearer(auto_error=False)
 
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
+@traced("deps.get_token_claims", stage="auth")
+def get_token_claims(
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> dict:
     if credentials is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -20,17 +22,37 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
      
-    token = credentials.credentials
-    email = decode_access_token(token)
+    claims = decode_access_token(credentials.credentials)
     
-    if email is None:
+    if claims is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    user = db.query(User).filter(User.email == email).first()
+    if "jti" in claims and revocation_list.is_revoked(claims["jti"]):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    return claims
+
+
+@traced("deps.get_current_user", stage="auth")
+def get_current_user(
+    claims: dict = Depends(get_token_claims),
+    db: Session = Depends(get_db)
+) -> User:
+    # Tokens carrying the user id and admin flag are trusted as-is, so
+    # authenticated requests need no user lookup. The returned instance is
+    # detached; load the row explicitly when other columns are needed.
+    if "uid" in claims:
+        return User(id=claims["uid"], email=claims["sub"], is_admin=claims.get("adm", False))
+    
+    user = db.query(User).filter(User.email == claims["sub"]).first()
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -41,6 +63,7 @@ def get_current_user(
     return user
 
 
+@traced("deps.get_current_admin_user", stage="auth")
 def get_current_admin_user(
     current_user: User = Depends(get_current_user)
 ) -> User:
@@ -49,4 +72,4 @@ def get_current_admin_user(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions"
         )
-    return current_user
\ No newline at end of file
+    return current_user
@@ -0,0 +1,110 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Tuple
+
+from fastapi import HTTPException, status
+from fastapi.encoders import jsonable_encoder
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+
+@dataclass
+class StoredResponse:
+    fingerprint: str
+    body: Any
+    expires_at: float
+
+
+def request_fingerprint(payload: Any) -> str:
+    encoded = json.dumps(jsonable_encoder(payload), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+class IdempotencyStore:
+    """In-memory LRU of completed responses keyed by idempotency key.
+
+    Entries expire after ``ttl_seconds`` and the least recently used ones are
+    evicted past ``max_entries``. Handlers should return immutable values
+    (e.g. response schemas) since replays share the stored object.
+    Concurrent requests sharing a key wait for the first one and then replay
+    its stored response instead of running the handler again. Failed
+    handlers store nothing, so a retry runs afresh.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10_000,
+        ttl_seconds: float = 86_400,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[str, StoredResponse]" = OrderedDict()
+        self._in_flight: Dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def execute(self, key: str, payload: Any, handler: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Run ``handler`` once per key and return ``(body, replayed)``."""
+        fingerprint = request_fingerprint(payload)
+        while True:
+            with self._lock:
+                stored = self._get(key)
+                if stored is not None:
+                    if stored.fingerprint != fingerprint:
+                        raise HTTPException(
+                            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                            detail="Idempotency-Key was already used for a different request"
+                        )
+                    return stored.body, True
+                in_flight = self._in_flight.get(key)
+                if in_flight is None:
+                    in_flight = threading.Event()
+                    self._in_flight[key] = in_flight
+                    break
+            in_flight.wait()
+
+        try:
+            body = handler()
+            with self._lock:
+                self._put(key, StoredResponse(fingerprint, body, self._clock() + self.ttl_seconds))
+            return body, False
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            in_flight.set()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _get(self, key: str):
+        stored = self._entries.get(key)
+        if stored is None:
+            return None
+        if stored.expires_at <= self._clock():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return stored
+
+    def _put(self, key: str, stored: StoredResponse):
+        self._entries[key] = stored
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+idempotency_store = IdempotencyStore(
+    max_entries=settings.idempotency_max_entries,
+    ttl_seconds=settings.idempotency_ttl_seconds
+)
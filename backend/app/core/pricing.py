@@ -0,0 +1,190 @@
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import and_, func, insert, or_, update
+from sqlalchemy.orm import Session
+
+from app.models.prices import PriceHistory
+from app.models.sweets import Sweet
+
+logger = logging.getLogger(__name__)
+
+
+def to_utc_naive(moment: datetime) -> datetime:
+    """Normalise a datetime to the naive UTC values stored in the database."""
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+
+def record_price(
+    db: Session,
+    sweet_id: int,
+    price: float,
+    effective_from: datetime,
+    applied: bool = False
+) -> PriceHistory:
+    """Insert a price into the sweet's history, keeping ranges contiguous.
+
+    The range covering ``effective_from`` is cut short there and the new
+    range runs until the next recorded change, if any. A change at exactly
+    the same instant replaces the existing price.
+    """
+    effective_from = to_utc_naive(effective_from)
+    history = db.query(PriceHistory).filter(PriceHistory.sweet_id == sweet_id)
+    
+    existing = history.filter(PriceHistory.effective_from == effective_from).first()
+    if existing is not None:
+        existing.price = price
+        existing.applied = existing.applied or applied
+        return existing
+    
+    covering = history.filter(
+        PriceHistory.effective_from < effective_from,
+        or_(PriceHistory.effective_to.is_(None), PriceHistory.effective_to > effective_from)
+    ).first()
+    following = history.filter(
+        PriceHistory.effective_from > effective_from
+    ).order_by(PriceHistory.effective_from).first()
+    
+    if covering is not None:
+        covering.effective_to = effective_from
+    entry = PriceHistory(
+        sweet_id=sweet_id,
+        price=price,
+        effective_from=effective_from,
+        effective_to=following.effective_from if following is not None else None,
+        applied=applied
+    )
+    db.add(entry)
+    return entry
+
+
+def price_at(at: datetime):
+    """Join condition and price expression for prices in effect at ``at``.
+
+    Ranges never overlap, so the outer join adds at most one row per sweet.
+    Sweets without a matching range fall back to their current price.
+    """
+    at = to_utc_naive(at)
+    condition = and_(
+        PriceHistory.sweet_id == Sweet.id,
+        PriceHistory.effective_from <= at,
+        or_(PriceHistory.effective_to.is_(None), PriceHistory.effective_to > at)
+    )
+    return condition, func.coalesce(PriceHistory.price, Sweet.price)
+
+
+def record_prices(
+    db: Session,
+    prices: Dict[int, float],
+    effective_from: datetime,
+    applied: bool = False
+):
+    """Set-based ``record_price`` for many sweets changing at the same instant.
+
+    Uses one UPDATE to cut the covering ranges, one grouped query for the
+    next recorded change per sweet and one multi-row INSERT. Unlike
+    ``record_price`` it assumes no entry starts exactly at ``effective_from``.
+    """
+    if not prices:
+        return
+    effective_from = to_utc_naive(effective_from)
+    sweet_ids = list(prices)
+    
+    db.execute(
+        update(PriceHistory)
+        .where(
+            PriceHistory.sweet_id.in_(sweet_ids),
+            PriceHistory.effective_from < effective_from,
+            or_(PriceHistory.effective_to.is_(None), PriceHistory.effective_to > effective_from)
+        )
+        .values(effective_to=effective_from)
+        .execution_options(synchronize_session=False)
+    )
+    following = dict(
+        db.query(PriceHistory.sweet_id, func.min(PriceHistory.effective_from))
+        .filter(PriceHistory.sweet_id.in_(sweet_ids), PriceHistory.effective_from > effective_from)
+        .group_by(PriceHistory.sweet_id)
+        .all()
+    )
+    db.execute(insert(PriceHistory), [
+        {
+            "sweet_id": sweet_id,
+            "price": price,
+            "effective_from": effective_from,
+            "effective_to": following.get(sweet_id),
+            "applied": applied,
+        }
+        for sweet_id, price in prices.items()
+    ])
+
+
+def apply_due_price_changes(db: Session, now: Optional[datetime] = None) -> List[int]:
+    """Copy scheduled prices that have taken effect onto ``sweets.price``."""
+    now = to_utc_naive(now or datetime.now(timezone.utc))
+    due = db.query(PriceHistory).filter(
+        PriceHistory.applied.is_(False),
+        PriceHistory.effective_from <= now
+    ).order_by(PriceHistory.effective_from).all()
+    
+    changed = set()
+    for entry in due:
+        entry.applied = True
+        # A back-dated change whose range already ended is history only.
+        if entry.effective_to is not None and entry.effective_to <= now:
+            continue
+        db.execute(
+            update(Sweet)
+            .where(Sweet.id == entry.sweet_id)
+            .values(price=entry.price, version=Sweet.version + 1)
+        )
+        changed.add(entry.sweet_id)
+    db.commit()
+    return sorted(changed)
+
+
+class PriceScheduler:
+    """Background thread applying scheduled price changes as they come due."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        interval_seconds: float = 30,
+        on_applied: Optional[Callable[[Session, List[int]], None]] = None
+    ):
+        self.session_factory = session_factory
+        self.interval_seconds = interval_seconds
+        self.on_applied = on_applied
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run_once(self, now: Optional[datetime] = None) -> List[int]:
+        db = self.session_factory()
+        try:
+            sweet_ids = apply_due_price_changes(db, now)
+            if sweet_ids and self.on_applied is not None:
+                self.on_applied(db, sweet_ids)
+        finally:
+            db.close()
+        return sweet_ids
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="price-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception("Applying scheduled price changes failed")
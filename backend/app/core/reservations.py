@@ -0,0 +1,190 @@
+import itertools
+import math
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+
+class TimingWheel:
+    """Hashed timing wheel mapping ids to deadlines.
+
+    Each id lives in the slot of the tick its deadline falls on, so
+    scheduling and cancelling are O(1) and advancing the wheel only looks
+    at the slots whose ticks have passed. Deadlines more than one
+    revolution away stay in their slot until a later pass reaches them.
+    """
+
+    def __init__(self, tick_seconds: float = 1.0, slot_count: int = 512, start: float = 0.0):
+        self.tick_seconds = tick_seconds
+        self.slot_count = slot_count
+        self._slots: List[Dict[int, float]] = [{} for _ in range(slot_count)]
+        self._slot_of: Dict[int, int] = {}
+        self._current_tick = self._tick(start)
+
+    def __len__(self) -> int:
+        return len(self._slot_of)
+
+    def _tick(self, moment: float) -> int:
+        return math.floor(moment / self.tick_seconds)
+
+    def schedule(self, item_id: int, deadline: float):
+        self.cancel(item_id)
+        slot = max(self._tick(deadline), self._current_tick) % self.slot_count
+        self._slots[slot][item_id] = deadline
+        self._slot_of[item_id] = slot
+
+    def cancel(self, item_id: int):
+        slot = self._slot_of.pop(item_id, None)
+        if slot is not None:
+            del self._slots[slot][item_id]
+
+    def advance(self, now: float) -> List[int]:
+        """Move the wheel to ``now`` and return the ids whose deadline passed."""
+        target_tick = self._tick(now)
+        if target_tick < self._current_tick:
+            return []
+        
+        expired = []
+        # After a full revolution every slot has been visited, so a long idle
+        # gap never costs more than one pass over the wheel.
+        ticks = min(target_tick - self._current_tick + 1, self.slot_count)
+        for tick in range(self._current_tick, self._current_tick + ticks):
+            slot = self._slots[tick % self.slot_count]
+            due = [item_id for item_id, deadline in slot.items() if deadline <= now]
+            for item_id in due:
+                del slot[item_id]
+                del self._slot_of[item_id]
+            expired.extend(due)
+        self._current_tick = target_tick
+        return expired
+
+
+@dataclass
+class Reservation:
+    id: int
+    user_id: int
+    sweet_id: int
+    quantity: int
+    expires_at: float
+
+
+class InsufficientStock(Exception):
+    pass
+
+
+class ReservationManager:
+    """In-process stock holds that expire through a timing wheel.
+
+    ``held(sweet_id)`` is the quantity currently promised to checkouts, so
+    purchasable stock is ``Sweet.quantity - held``. Expiry is applied
+    lazily at the start of every operation by advancing the wheel to the
+    current time, so no background task scans for stale holds. A claimed
+    reservation stops being visible to its owner but keeps holding stock
+    until ``settle`` is called once the purchase is committed or abandoned.
+
+    Callers hold ``stock_lock(sweet_id)`` from reading the stock (or
+    ``held``) until their reservation or purchase is in place, so a hold and
+    a purchase of the same sweet never both count on the same units.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.time, tick_seconds: float = 1.0):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._reservations: Dict[int, Reservation] = {}
+        self._held: Dict[int, int] = {}
+        self._wheel = TimingWheel(tick_seconds=tick_seconds, start=clock())
+        self._stock_locks: Dict[int, threading.Lock] = {}
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._expire()
+            return len(self._reservations)
+
+    def stock_lock(self, sweet_id: int) -> threading.Lock:
+        with self._lock:
+            return self._stock_locks.setdefault(sweet_id, threading.Lock())
+
+    def held(self, sweet_id: int) -> int:
+        with self._lock:
+            self._expire()
+            return self._held.get(sweet_id, 0)
+
+    def reserve(
+        self,
+        user_id: int,
+        sweet_id: int,
+        quantity: int,
+        ttl_seconds: float,
+        stock: int
+    ) -> Reservation:
+        with self._lock:
+            self._expire()
+            held = self._held.get(sweet_id, 0)
+            if held + quantity > stock:
+                raise InsufficientStock()
+            
+            reservation = Reservation(
+                id=next(self._ids),
+                user_id=user_id,
+                sweet_id=sweet_id,
+                quantity=quantity,
+                expires_at=self._clock() + ttl_seconds
+            )
+            self._reservations[reservation.id] = reservation
+            self._held[sweet_id] = held + quantity
+            self._wheel.schedule(reservation.id, reservation.expires_at)
+            return reservation
+
+    def get(self, reservation_id: int, user_id: int) -> Optional[Reservation]:
+        with self._lock:
+            self._expire()
+            reservation = self._reservations.get(reservation_id)
+            if reservation is None or reservation.user_id != user_id:
+                return None
+            return reservation
+
+    def claim(self, reservation_id: int, user_id: int) -> Optional[Reservation]:
+        with self._lock:
+            self._expire()
+            reservation = self._reservations.get(reservation_id)
+            if reservation is None or reservation.user_id != user_id:
+                return None
+            del self._reservations[reservation_id]
+            self._wheel.cancel(reservation_id)
+            return reservation
+
+    def settle(self, reservation: Reservation):
+        with self._lock:
+            self._unhold(reservation)
+
+    def release(self, reservation_id: int, user_id: int) -> bool:
+        reservation = self.claim(reservation_id, user_id)
+        if reservation is None:
+            return False
+        self.settle(reservation)
+        return True
+
+    def clear(self):
+        with self._lock:
+            for reservation_id in list(self._reservations):
+                self._wheel.cancel(reservation_id)
+            self._reservations.clear()
+            self._held.clear()
+
+    def _unhold(self, reservation: Reservation):
+        remaining = self._held.get(reservation.sweet_id, 0) - reservation.quantity
+        if remaining > 0:
+            self._held[reservation.sweet_id] = remaining
+        else:
+            self._held.pop(reservation.sweet_id, None)
+
+    def _expire(self):
+        for reservation_id in self._wheel.advance(self._clock()):
+            reservation = self._reservations.pop(reservation_id, None)
+            if reservation is not None:
+                self._unhold(reservation)
+
+
+reservation_manager = ReservationManager()
@@ -0,0 +1,89 @@
+import hashlib
+import threading
+import time
+from typing import Callable, Dict
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings using ``hash_count`` blake2b probes."""
+
+    def __init__(self, size_bits: int = 1 << 20, hash_count: int = 4):
+        self.size_bits = size_bits
+        self.hash_count = hash_count
+        self._bits = bytearray(size_bits // 8)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=8 * self.hash_count).digest()
+        for offset in range(0, len(digest), 8):
+            yield int.from_bytes(digest[offset:offset + 8], "little") % self.size_bits
+
+    def add(self, item: str):
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item)
+        )
+
+
+class RevocationList:
+    """Denylist of revoked access-token ids (``jti``), kept until the token expires.
+
+    Lookups cost a few hash probes against a Bloom filter, which answers the
+    common "not revoked" case without touching the dict; only probable hits
+    fall through to the exact check. Expired entries are purged at most once
+    per ``purge_interval`` seconds and the filter is rebuilt from the rest.
+    The list is in memory and per process, so revocations last until the
+    short-lived access token would have expired anyway or the process restarts.
+    """
+
+    def __init__(
+        self,
+        size_bits: int = 1 << 20,
+        hash_count: int = 4,
+        purge_interval: float = 60,
+        clock: Callable[[], float] = time.time
+    ):
+        self._size_bits = size_bits
+        self._hash_count = hash_count
+        self._purge_interval = purge_interval
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._expires_at: Dict[str, float] = {}
+        self._filter = BloomFilter(size_bits, hash_count)
+        self._next_purge = clock() + purge_interval
+
+    def __len__(self) -> int:
+        return len(self._expires_at)
+
+    def revoke(self, jti: str, expires_at: float):
+        with self._lock:
+            self._expires_at[jti] = expires_at
+            self._filter.add(jti)
+            if self._clock() >= self._next_purge:
+                self._purge()
+
+    def is_revoked(self, jti: str) -> bool:
+        if jti not in self._filter:
+            return False
+        expires_at = self._expires_at.get(jti)
+        return expires_at is not None and expires_at > self._clock()
+
+    def clear(self):
+        with self._lock:
+            self._expires_at.clear()
+            self._filter = BloomFilter(self._size_bits, self._hash_count)
+
+    def _purge(self):
+        now = self._clock()
+        self._expires_at = {
+            jti: expires_at for jti, expires_at in self._expires_at.items() if expires_at > now
+        }
+        self._filter = BloomFilter(self._size_bits, self._hash_count)
+        for jti in self._expires_at:
+            self._filter.add(jti)
+        self._next_purge = now + self._purge_interval
+
+
+revocation_list = RevocationList()
@@ -1,23 +1,30 @@
+import hashlib
+import secrets
+import uuid
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 
 from app.core.config import get_settings
+from app.core.tracing import traced
 
 settings = get_settings()
 
 pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
 
 
+@traced("security.verify_password", stage="auth")
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+@traced("security.get_password_hash", stage="auth")
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+@traced("security.create_access_token", stage="auth")
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
     if expires_delta:
@@ -25,17 +32,28 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.access_token_expire_minutes)
     
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
     return encoded_jwt
 
 
-def decode_access_token(token: str) -> Optional[str]:
+@traced("security.decode_access_token", stage="auth")
+def decode_access_token(token: str) -> Optional[dict]:
     try:
         payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
-        email: str = payload.get("sub")
-        if email is None:
+        if payload.get("sub") is None:
             return None
-        return email
+        return payload
     except JWTError:
-        return None
\ No newline at end of file
+        return None
+
+
+def hash_refresh_token(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def create_refresh_token() -> Tuple[str, str, datetime]:
+    """Return an opaque refresh token, its stored hash and its expiry."""
+    token = secrets.token_urlsafe(32)
+    expires_at = datetime.utcnow() + timedelta(days=settings.refresh_token_expire_days)
+    return token, hash_refresh_token(token), expires_at
@@ -0,0 +1,219 @@
+"""Slow-query log with plan capture.
+
+``SlowQueryLog.install`` hooks the cursor-execute events of every SQLAlchemy
+engine. Statements slower than ``threshold_ms`` are logged with the types of
+their bound parameters (never the values) and aggregated by fingerprint:
+the statement with literals and placeholders replaced by ``?`` and
+``IN``/``VALUES`` lists collapsed. The first slow execution of a fingerprint
+and a ``explain_sample_rate`` share of the later ones capture a plan on the
+same connection: ``EXPLAIN QUERY PLAN`` on SQLite, ``EXPLAIN ANALYZE`` for
+SELECTs on PostgreSQL and plain ``EXPLAIN`` for writes there, since
+``ANALYZE`` would run them a second time.
+"""
+import hashlib
+import logging
+import random
+import re
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+logger = logging.getLogger(__name__)
+
+MAX_STATEMENT_LENGTH = 2000
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s|\$\d+|(?<![:\w]):\w+|\?")
+_NUMBER = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?(?:e-?\d+)?\b", re.IGNORECASE)
+_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_ROWS = re.compile(r"\(\?\+\)(?:\s*,\s*\(\?\+\))+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_statement(statement: str) -> str:
+    normalized = _STRING.sub("?", statement)
+    normalized = _PLACEHOLDER.sub("?", normalized)
+    normalized = _NUMBER.sub("?", normalized)
+    normalized = _WHITESPACE.sub(" ", normalized).strip()
+    normalized = _LIST.sub("(?+)", normalized)
+    return _ROWS.sub("(?+)", normalized)
+
+
+def fingerprint(statement: str) -> str:
+    return hashlib.sha1(normalize_statement(statement).encode()).hexdigest()[:16]
+
+
+def parameter_shape(parameters, executemany: bool = False):
+    """Types of the bound parameters, for logging without the values."""
+    if executemany:
+        rows = list(parameters or [])
+        return {"rows": len(rows), "row": parameter_shape(rows[0]) if rows else None}
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return None
+
+
+class SlowQueryStats:
+    def __init__(self, key: str, statement: str):
+        self.fingerprint = key
+        self.statement = normalize_statement(statement)[:MAX_STATEMENT_LENGTH]
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.last_seen: Optional[datetime] = None
+        self.parameters = None
+        self.plan: Optional[str] = None
+        self.plan_captured_at: Optional[datetime] = None
+
+    def to_dict(self) -> dict:
+        return {
+            "fingerprint": self.fingerprint,
+            "statement": self.statement,
+            "count": self.count,
+            "total_ms": round(self.total_ms, 3),
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "last_seen": self.last_seen,
+            "parameters": self.parameters,
+            "plan": self.plan,
+            "plan_captured_at": self.plan_captured_at,
+        }
+
+
+class SlowQueryLog:
+    def __init__(
+        self,
+        threshold_ms: float = 200,
+        explain_sample_rate: float = 0.1,
+        max_fingerprints: int = 500,
+        enabled: bool = True,
+        clock: Callable[[], float] = time.perf_counter
+    ):
+        self.threshold_ms = threshold_ms
+        self.explain_sample_rate = explain_sample_rate
+        self.max_fingerprints = max_fingerprints
+        self.enabled = enabled
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._stats: Dict[str, SlowQueryStats] = {}
+        self._installed = False
+        self._started_key = f"slow_query_started_{id(self)}"
+
+    def install(self, target=Engine):
+        """Listen on ``target`` (every engine by default). Idempotent."""
+        with self._lock:
+            if self._installed:
+                return
+            event.listen(target, "before_cursor_execute", self._before_cursor_execute)
+            event.listen(target, "after_cursor_execute", self._after_cursor_execute)
+            event.listen(target, "handle_error", self._handle_error)
+            self._installed = True
+
+    def clear(self):
+        with self._lock:
+            self._stats.clear()
+
+    def top(self, limit: int = 20, order_by: str = "total_ms") -> List[dict]:
+        with self._lock:
+            entries = [stats.to_dict() for stats in self._stats.values()]
+        return sorted(entries, key=lambda entry: entry[order_by], reverse=True)[:limit]
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if self.enabled:
+            conn.info.setdefault(self._started_key, []).append(self._clock())
+
+    def _handle_error(self, exception_context):
+        connection = exception_context.connection
+        started = connection.info.get(self._started_key) if connection is not None else None
+        if started:
+            started.pop()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.get(self._started_key)
+        if not started:
+            return
+        duration_ms = (self._clock() - started.pop()) * 1000
+        if duration_ms < self.threshold_ms:
+            return
+
+        shape = parameter_shape(parameters, executemany)
+        logger.warning("Slow query (%.1f ms): %s parameters=%s", duration_ms, statement, shape)
+
+        key = fingerprint(statement)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                if len(self._stats) >= self.max_fingerprints:
+                    cheapest = min(self._stats.values(), key=lambda entry: entry.total_ms)
+                    del self._stats[cheapest.fingerprint]
+                stats = self._stats[key] = SlowQueryStats(key, statement)
+            stats.count += 1
+            stats.total_ms += duration_ms
+            stats.max_ms = max(stats.max_ms, duration_ms)
+            stats.last_seen = datetime.utcnow()
+            stats.parameters = shape
+            sampled = stats.plan is None or random.random() < self.explain_sample_rate
+            explain = not executemany and sampled
+
+        if explain:
+            plan = self._explain(conn, statement, parameters)
+            if plan is not None:
+                with self._lock:
+                    stats.plan = plan
+                    stats.plan_captured_at = datetime.utcnow()
+
+    def _explain(self, conn, statement: str, parameters) -> Optional[str]:
+        dialect = conn.dialect.name
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+        if operation not in ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE"):
+            return None
+
+        if dialect == "sqlite":
+            prefix, savepoint = "EXPLAIN QUERY PLAN ", False
+        elif dialect == "postgresql":
+            prefix = "EXPLAIN ANALYZE " if operation == "SELECT" else "EXPLAIN "
+            # A failed statement aborts a PostgreSQL transaction; the
+            # savepoint keeps the caller's transaction usable.
+            savepoint = True
+        else:
+            prefix, savepoint = "EXPLAIN ", False
+
+        # A raw DBAPI cursor keeps the EXPLAIN out of the engine events.
+        cursor = conn.connection.dbapi_connection.cursor()
+        try:
+            if savepoint:
+                cursor.execute("SAVEPOINT slow_query_explain")
+            try:
+                cursor.execute(prefix + statement, parameters)
+                rows = cursor.fetchall()
+            except Exception as exc:
+                if savepoint:
+                    cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+                logger.debug("Could not explain slow query: %s", exc)
+                return None
+            if savepoint:
+                cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+        finally:
+            cursor.close()
+
+        if dialect == "sqlite":
+            return "\n".join(str(row[-1]) for row in rows)
+        return "\n".join(" | ".join(str(column) for column in row) for row in rows)
+
+
+slow_query_log = SlowQueryLog(
+    threshold_ms=settings.slow_query_threshold_ms,
+    explain_sample_rate=settings.slow_query_explain_sample_rate,
+    max_fingerprints=settings.slow_query_max_fingerprints,
+    enabled=settings.slow_query_log_enabled
+)
@@ -0,0 +1,370 @@
+"""Lightweight request tracing.
+
+Spans follow the OpenTelemetry data model (16-byte trace ids, 8-byte span
+ids, parent links, nanosecond timestamps, attributes and a status) and are
+exported as OTLP-style JSON lines, one span per line, to stdout or a file.
+A sampled request gets a root span from ``TracingMiddleware``; functions
+wrapped with ``traced`` and the SQLAlchemy hooks installed by
+``instrument_sqlalchemy`` add child spans while it is active and do nothing
+otherwise. Each span can be tagged with a stage (``auth``, ``db``,
+``commit``) and the stage totals are returned in a ``Server-Timing`` header.
+
+Sampling follows a W3C ``traceparent`` header when one is sent and
+otherwise keeps ``sample_rate`` of the traces by trace id.
+"""
+import contextvars
+import functools
+import json
+import os
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, TextIO, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+MAX_STATEMENT_LENGTH = 1000
+
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar(
+    "current_span", default=None
+)
+
+
+class Span:
+    """One timed operation inside a trace."""
+
+    def __init__(
+        self,
+        trace: "Trace",
+        name: str,
+        parent: Optional["Span"] = None,
+        stage: Optional[str] = None,
+        attributes: Optional[dict] = None,
+        parent_span_id: Optional[str] = None
+    ):
+        self.trace = trace
+        self.name = name
+        self.span_id = os.urandom(8).hex()
+        self.parent_span_id = parent.span_id if parent is not None else parent_span_id
+        self.stage = stage
+        # A span nested inside another span of the same stage is already
+        # covered by its ancestor's duration.
+        parent_stages = parent.stages if parent is not None else frozenset()
+        self.counted = stage is not None and stage not in parent_stages
+        self.stages = parent_stages | {stage} if stage is not None else parent_stages
+        self.attributes = dict(attributes or {})
+        self.status = "UNSET"
+        self.status_message = None
+        self.start_time_unix_nano = time.time_ns()
+        self.end_time_unix_nano: Optional[int] = None
+        self._started = time.perf_counter_ns()
+        self.duration_ns: Optional[int] = None
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+    def record_error(self, error: BaseException):
+        self.status = "ERROR"
+        self.status_message = f"{type(error).__name__}: {error}"
+
+    def end(self):
+        if self.duration_ns is not None:
+            return
+        self.duration_ns = time.perf_counter_ns() - self._started
+        self.end_time_unix_nano = self.start_time_unix_nano + self.duration_ns
+        self.trace.spans.append(self)
+
+    def to_dict(self) -> dict:
+        status = {"code": self.status}
+        if self.status_message:
+            status["message"] = self.status_message
+        return {
+            "traceId": self.trace.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_span_id or "",
+            "name": self.name,
+            "kind": "SERVER" if self is self.trace.root else "INTERNAL",
+            "startTimeUnixNano": self.start_time_unix_nano,
+            "endTimeUnixNano": self.end_time_unix_nano,
+            "attributes": self.attributes,
+            "status": status,
+        }
+
+
+class Trace:
+    def __init__(self, trace_id: str):
+        self.trace_id = trace_id
+        self.root: Optional[Span] = None
+        self.spans: List[Span] = []
+
+    def stage_timings(self) -> Dict[str, Tuple[float, int]]:
+        """Milliseconds and span count per stage for the spans ended so far."""
+        timings: Dict[str, Tuple[float, int]] = {}
+        for span in list(self.spans):
+            if span.counted:
+                total, count = timings.get(span.stage, (0.0, 0))
+                timings[span.stage] = (total + span.duration_ns / 1e6, count + 1)
+        return timings
+
+
+class ConsoleSpanExporter:
+    def __init__(self, stream: TextIO = sys.stdout):
+        self.stream = stream
+        self._lock = threading.Lock()
+
+    def export(self, spans: List[Span]):
+        lines = "".join(json.dumps(span.to_dict()) + "\n" for span in spans)
+        with self._lock:
+            self.stream.write(lines)
+            self.stream.flush()
+
+
+class FileSpanExporter:
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, spans: List[Span]):
+        lines = "".join(json.dumps(span.to_dict()) + "\n" for span in spans)
+        with self._lock, open(self.path, "a") as trace_file:
+            trace_file.write(lines)
+
+
+class Tracer:
+    def __init__(self, enabled: bool = True, sample_rate: float = 1.0, exporter=None):
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+        self.exporter = exporter
+
+    def start_trace(
+        self,
+        name: str,
+        traceparent: Optional[str] = None,
+        attributes: Optional[dict] = None
+    ) -> Optional[Span]:
+        """Start a root span, or return None when the trace is not sampled."""
+        if not self.enabled:
+            return None
+
+        match = TRACEPARENT.match((traceparent or "").strip().lower())
+        if match:
+            trace_id, parent_span_id, flags = match.groups()
+            if not int(flags, 16) & 1:
+                return None
+        else:
+            trace_id, parent_span_id = os.urandom(16).hex(), None
+            # Ratio sampling on the trace id, as in OpenTelemetry's TraceIdRatioBased.
+            if int(trace_id[16:], 16) >= self.sample_rate * 2 ** 64:
+                return None
+
+        trace = Trace(trace_id)
+        trace.root = Span(trace, name, attributes=attributes, parent_span_id=parent_span_id)
+        return trace.root
+
+    def finish_trace(self, root: Span):
+        root.end()
+        if self.exporter is not None:
+            spans = sorted(root.trace.spans, key=lambda span: span.start_time_unix_nano)
+            self.exporter.export(spans)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def start_span(
+    name: str,
+    stage: Optional[str] = None,
+    attributes: Optional[dict] = None
+) -> Optional[Span]:
+    """Start a child of the current span without making it current."""
+    parent = _current_span.get()
+    if parent is None:
+        return None
+    return Span(parent.trace, name, parent, stage, attributes)
+
+
+@contextmanager
+def span(name: str, stage: Optional[str] = None, **attributes):
+    """Trace the enclosed block as a child of the current span, if any."""
+    child = start_span(name, stage, attributes)
+    if child is None:
+        yield None
+        return
+
+    token = _current_span.set(child)
+    try:
+        yield child
+    except BaseException as exc:
+        child.record_error(exc)
+        raise
+    finally:
+        _current_span.reset(token)
+        child.end()
+
+
+def traced(name: str, stage: Optional[str] = None) -> Callable:
+    """Decorator tracing each call of a function. Safe on FastAPI dependencies."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _current_span.get() is None:
+                return fn(*args, **kwargs)
+            with span(name, stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def format_server_timing(root: Span) -> str:
+    entries = []
+    for stage, (milliseconds, count) in root.trace.stage_timings().items():
+        entry = f"{stage};dur={milliseconds:.2f}"
+        if count > 1:
+            entry += f';desc="{count} calls"'
+        entries.append(entry)
+    elapsed = (time.perf_counter_ns() - root._started) / 1e6
+    entries.append(f"total;dur={elapsed:.2f}")
+    return ", ".join(entries)
+
+
+class TracingMiddleware:
+    """Open a root span per sampled request and report stage timings.
+
+    The ``Server-Timing`` header is written when the response starts, so it
+    covers everything up to the first byte of the body.
+    """
+
+    def __init__(self, app: ASGIApp, tracer: "Tracer"):
+        self.app = app
+        self.tracer = tracer
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not self.tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        root = self.tracer.start_trace(
+            f"{scope['method']} {scope['path']}",
+            headers.get("traceparent"),
+            {"http.method": scope["method"], "http.target": scope["path"]}
+        )
+        if root is None:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_timing(message: Message):
+            if message["type"] == "http.response.start":
+                root.set_attribute("http.status_code", message["status"])
+                if message["status"] >= 500:
+                    root.status = "ERROR"
+                MutableHeaders(scope=message).append("Server-Timing", format_server_timing(root))
+            await send(message)
+
+        token = _current_span.set(root)
+        try:
+            await self.app(scope, receive, send_with_timing)
+        except BaseException as exc:
+            root.record_error(exc)
+            raise
+        finally:
+            _current_span.reset(token)
+            endpoint = scope.get("endpoint")
+            if endpoint is not None:
+                root.set_attribute("code.function", getattr(endpoint, "__name__", str(endpoint)))
+            self.tracer.finish_trace(root)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    operation = statement.split(None, 1)[0].upper() if statement.strip() else "STATEMENT"
+    child = start_span(
+        f"db {operation}",
+        stage="db",
+        attributes={
+            "db.system": conn.dialect.name,
+            "db.statement": statement[:MAX_STATEMENT_LENGTH],
+            "db.executemany": executemany,
+        }
+    )
+    if child is not None:
+        conn.info.setdefault("tracing_spans", []).append(child)
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    spans = conn.info.get("tracing_spans")
+    if spans:
+        child = spans.pop()
+        if cursor is not None and cursor.rowcount is not None and cursor.rowcount >= 0:
+            child.set_attribute("db.rowcount", cursor.rowcount)
+        child.end()
+
+
+def _handle_error(exception_context):
+    connection = exception_context.connection
+    spans = connection.info.get("tracing_spans") if connection is not None else None
+    if spans:
+        child = spans.pop()
+        child.record_error(exception_context.original_exception)
+        child.end()
+
+
+def _before_commit(session):
+    child = start_span("db.commit", stage="commit")
+    if child is not None:
+        # Made current so the flush statements nest under the commit.
+        session.info["tracing_commit"] = (child, _current_span.set(child))
+
+
+def _end_commit(session):
+    entry = session.info.pop("tracing_commit", None)
+    if entry is not None:
+        child, token = entry
+        _current_span.reset(token)
+        child.end()
+
+
+_instrument_lock = threading.Lock()
+_instrumented = False
+
+
+def instrument_sqlalchemy():
+    """Trace statements on every engine and commits on every session. Idempotent."""
+    global _instrumented
+    with _instrument_lock:
+        if _instrumented:
+            return
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(Engine, "handle_error", _handle_error)
+        event.listen(Session, "before_commit", _before_commit)
+        event.listen(Session, "after_commit", _end_commit)
+        event.listen(Session, "after_rollback", _end_commit)
+        _instrumented = True
+
+
+def build_exporter(name: str, file_path: str):
+    if name == "console":
+        return ConsoleSpanExporter()
+    if name == "file":
+        return FileSpanExporter(file_path)
+    return None
+
+
+tracer = Tracer(
+    enabled=settings.tracing_enabled,
+    sample_rate=settings.tracing_sample_rate,
+    exporter=build_exporter(settings.tracing_exporter, settings.tracing_file_path)
+)
@@ -0,0 +1,241 @@
+"""Write-behind batching of purchase decrements (group commit).
+
+When ``PURCHASE_WRITE_BEHIND`` is enabled, purchases are validated against
+an in-memory counter per sweet instead of locking the row, and a single
+flusher thread writes the accumulated decrements and their orders to the
+database every ``PURCHASE_FLUSH_INTERVAL_MS`` milliseconds in one
+transaction. Many purchases of the same hot sweet therefore share one
+UPDATE and one commit.
+
+Crash safety: a purchase call returns only after the group commit that
+contains it succeeded, so an acknowledged purchase is always durable. If
+the process dies before a flush, the buffered purchases were never
+acknowledged (their clients see an error or a dropped connection) and the
+counters are rebuilt from ``sweets.quantity`` on the next start. A failed
+flush rolls back, fails every purchase in the batch and drops the counters
+of the sweets involved so they are reloaded from the database.
+
+The counters are authoritative only for the process that owns them. Enable
+this mode only when a single worker serves purchases, or when purchases
+for a given sweet are always routed to the same worker; the conditional
+UPDATE still refuses to drive stock negative if that assumption breaks.
+"""
+import threading
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.models.sweets import Sweet
+
+
+class SweetNotFound(Exception):
+    pass
+
+
+class InsufficientStock(Exception):
+    pass
+
+
+@dataclass
+class StockCounter:
+    id: int
+    name: str
+    category: str
+    price: float
+    quantity: int
+    version: int
+
+
+@dataclass
+class PendingPurchase:
+    user_id: int
+    sweet: StockCounter
+    quantity: int
+    done: threading.Event = field(default_factory=threading.Event)
+    error: Optional[BaseException] = None
+
+
+class PurchaseBatcher:
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        flush_interval: float = 0.005,
+        record_orders: Optional[Callable] = None
+    ):
+        self.session_factory = session_factory
+        self.flush_interval = flush_interval
+        self._record_orders = record_orders
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._counters: Dict[int, StockCounter] = {}
+        self._unflushed: Dict[int, int] = defaultdict(int)
+        self._unflushed_purchases: Dict[int, int] = defaultdict(int)
+        self._pending: List[PendingPurchase] = []
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self.flushes = 0
+        self.flushed_purchases = 0
+
+    def purchase(self, user_id: int, sweet_id: int, quantity: int, held: int = 0) -> StockCounter:
+        """Buffer a purchase and block until the group commit holding it finishes.
+
+        Returns a snapshot of the sweet after the purchase.
+        """
+        return self.wait(self.enqueue(user_id, sweet_id, quantity, held))
+
+    def enqueue(self, user_id: int, sweet_id: int, quantity: int, held: int = 0) -> PendingPurchase:
+        """Take ``quantity`` off the counter and queue it for the next flush."""
+        while True:
+            counter = self._counter(sweet_id)
+            with self._lock:
+                if self._counters.get(sweet_id) is not counter:
+                    continue
+                if counter.quantity - held < quantity:
+                    raise InsufficientStock()
+                
+                counter.quantity -= quantity
+                counter.version += 1
+                pending = PendingPurchase(user_id, StockCounter(**vars(counter)), quantity)
+                self._pending.append(pending)
+                self._unflushed[sweet_id] += quantity
+                self._unflushed_purchases[sweet_id] += 1
+                self._ensure_flusher()
+                self._wakeup.notify()
+                return pending
+
+    def wait(self, pending: PendingPurchase) -> StockCounter:
+        """Block until ``pending`` is committed and return its snapshot."""
+        pending.done.wait()
+        if pending.error is not None:
+            raise pending.error
+        return pending.sweet
+
+    def available(self, sweet_id: int) -> int:
+        """Stock left after the purchases buffered so far."""
+        while True:
+            counter = self._counter(sweet_id)
+            with self._lock:
+                if self._counters.get(sweet_id) is counter:
+                    return counter.quantity
+
+    def invalidate(self, sweet_id: int):
+        """Forget the counter of a sweet changed outside the batcher."""
+        with self._lock:
+            self._counters.pop(sweet_id, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "counters": len(self._counters),
+                "pending": len(self._pending),
+                "flushes": self.flushes,
+                "flushed_purchases": self.flushed_purchases,
+            }
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            self._wakeup.notify()
+            thread = self._thread
+        if thread is not None:
+            thread.join()
+
+    def _counter(self, sweet_id: int) -> StockCounter:
+        with self._lock:
+            counter = self._counters.get(sweet_id)
+            if counter is not None:
+                return counter
+            # Decrements that are buffered or mid-flush may not be visible in
+            # the row yet; subtracting them errs on the side of underselling.
+            unflushed = self._unflushed.get(sweet_id, 0)
+            unflushed_purchases = self._unflushed_purchases.get(sweet_id, 0)
+        
+        db = self.session_factory()
+        try:
+            sweet = db.get(Sweet, sweet_id)
+            if sweet is None:
+                raise SweetNotFound()
+            counter = StockCounter(
+                id=sweet.id,
+                name=sweet.name,
+                category=sweet.category,
+                price=sweet.price,
+                quantity=sweet.quantity - unflushed,
+                version=sweet.version + unflushed_purchases
+            )
+        finally:
+            db.close()
+        
+        with self._lock:
+            return self._counters.setdefault(sweet_id, counter)
+
+    def _ensure_flusher(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._closed = False
+            self._thread = threading.Thread(target=self._run, name="purchase-flusher", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._lock:
+                while not self._pending and not self._closed:
+                    self._wakeup.wait()
+                if not self._pending and self._closed:
+                    return
+                # Give concurrent purchases a moment to join this batch.
+                self._wakeup.wait(self.flush_interval)
+                batch, self._pending = self._pending, []
+            self._flush(batch)
+
+    def _flush(self, batch: List[PendingPurchase]):
+        totals: Dict[int, int] = defaultdict(int)
+        purchases: Dict[int, int] = defaultdict(int)
+        for pending in batch:
+            totals[pending.sweet.id] += pending.quantity
+            purchases[pending.sweet.id] += 1
+        
+        error = None
+        db = self.session_factory()
+        try:
+            for sweet_id, total in totals.items():
+                result = db.execute(
+                    update(Sweet)
+                    .where(Sweet.id == sweet_id, Sweet.quantity >= total)
+                    .values(
+                        quantity=Sweet.quantity - total,
+                        version=Sweet.version + purchases[sweet_id]
+                    )
+                )
+                if result.rowcount != 1:
+                    raise InsufficientStock()
+            if self._record_orders is not None:
+                self._record_orders(db, [
+                    (pending.user_id, [(pending.sweet, pending.quantity)]) for pending in batch
+                ])
+            db.commit()
+        except BaseException as exc:
+            db.rollback()
+            error = exc
+        finally:
+            db.close()
+        
+        with self._lock:
+            for sweet_id, total in totals.items():
+                self._unflushed[sweet_id] -= total
+                self._unflushed_purchases[sweet_id] -= purchases[sweet_id]
+                if not self._unflushed[sweet_id]:
+                    del self._unflushed[sweet_id]
+                if not self._unflushed_purchases[sweet_id]:
+                    del self._unflushed_purchases[sweet_id]
+                if error is not None:
+                    self._counters.pop(sweet_id, None)
+            self.flushes += 1
+            if error is None:
+                self.flushed_purchases += len(batch)
+        
+        for pending in batch:
+            pending.error = error
+            pending.done.set()
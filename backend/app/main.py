@@ -1,15 +1,57 @@
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.core.database import create_tables
+from app.core.catalog_index import catalog_index
+from app.core.compression import CompressionMiddleware
+from app.core.database import SessionLocal, create_tables
+from app.core.pricing import PriceScheduler
+from app.core.slow_queries import slow_query_log
+from app.core.tracing import TracingMiddleware, instrument_sqlalchemy, tracer
 from app.core.config import get_settings
 from app.api.main import api_router
+from app.api.routes.sweets import purchase_batcher, refresh_catalog
+from app.models.sweets import Sweet
 
 settings = get_settings()
 
+logger = logging.getLogger(__name__)
+
+price_scheduler = PriceScheduler(
+    SessionLocal,
+    interval_seconds=settings.price_scheduler_interval_seconds,
+    on_applied=refresh_catalog
+)
+
+
+def build_catalog_index():
+    if catalog_index is None:
+        logger.warning("CATALOG_INDEX_ENABLED is set but numpy is not installed; using SQL search")
+        return
+    db = SessionLocal()
+    try:
+        catalog_index.rebuild(db.query(Sweet).all())
+    finally:
+        db.close()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    create_tables()
+    if settings.catalog_index_enabled:
+        build_catalog_index()
+    price_scheduler.start()
+    yield
+    price_scheduler.stop()
+    purchase_batcher.close()
+
+
 app = FastAPI(
     title=settings.app_name,
-    debug=settings.debug
+    debug=settings.debug,
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -19,10 +61,10 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
-
-@app.on_event("startup")
-def startup_event():
-    create_tables()
+app.add_middleware(CompressionMiddleware, minimum_size=settings.compression_minimum_size)
+app.add_middleware(TracingMiddleware, tracer=tracer)
+instrument_sqlalchemy()
+slow_query_log.install()
 
 @app.get("/")
 def root():
@@ -0,0 +1,18 @@
+from sqlalchemy import Boolean, Column, DateTime, Float, ForeignKey, Index, Integer
+
+from app.core.database import Base
+
+
+class PriceHistory(Base):
+    __tablename__ = "price_history"
+    __table_args__ = (
+        Index("ix_price_history_sweet_id_effective_from", "sweet_id", "effective_from"),
+        Index("ix_price_history_applied_effective_from", "applied", "effective_from"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    sweet_id = Column(Integer, ForeignKey("sweets.id", ondelete="CASCADE"), nullable=False)
+    price = Column(Float, nullable=False)
+    effective_from = Column(DateTime, nullable=False)
+    effective_to = Column(DateTime, nullable=True)
+    applied = Column(Boolean, default=False, nullable=False)
@@ -10,4 +10,5 @@ class Sweet(Base):
     name = Column(String, index=True, nullable=False)
     category = Column(String, index=True, nullable=False)
     price = Column(Float, nullable=False)
-    quantity = Column(Integer, nullable=False, default=0)
\ No newline at end of file
+    quantity = Column(Integer, nullable=False, default=0)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
@@ -0,0 +1,29 @@
+from datetime import datetime
+from typing import List
+
+from pydantic import BaseModel
+
+
+class OrderLineResponse(BaseModel):
+    sweet_id: int | None
+    sweet_name: str
+    unit_price: float
+    quantity: int
+    
+    class Config:
+        from_attributes = True
+
+
+class OrderResponse(BaseModel):
+    id: int
+    created_at: datetime
+    total: float
+    lines: List[OrderLineResponse]
+    
+    class Config:
+        from_attributes = True
+
+
+class OrderPage(BaseModel):
+    items: List[OrderResponse]
+    next_cursor: str | None = None
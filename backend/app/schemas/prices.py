@@ -0,0 +1,24 @@
+from datetime import datetime
+
+from pydantic import BaseModel, Field
+
+
+class PriceChangeCreate(BaseModel):
+    price: float = Field(..., gt=0)
+    effective_from: datetime
+
+
+class PriceHistoryResponse(BaseModel):
+    price: float
+    effective_from: datetime
+    effective_to: datetime | None
+    applied: bool
+    
+    class Config:
+        from_attributes = True
+
+
+class PriceAtResponse(BaseModel):
+    sweet_id: int
+    price: float
+    at: datetime
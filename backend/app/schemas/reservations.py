@@ -0,0 +1,16 @@
+from datetime import datetime
+
+from pydantic import BaseModel, Field
+
+
+class ReservationCreate(BaseModel):
+    sweet_id: int
+    quantity: int = Field(..., gt=0)
+    ttl_seconds: int = Field(300, ge=1, le=3600)
+
+
+class ReservationResponse(BaseModel):
+    id: int
+    sweet_id: int
+    quantity: int
+    expires_at: datetime
@@ -1,4 +1,6 @@
-from pydantic import BaseModel, Field
+from typing import List
+
+from pydantic import BaseModel, Field, model_validator
 
 
 class SweetBase(BaseModel):
@@ -19,12 +21,80 @@ class SweetUpdate(BaseModel):
     quantity: int | None = Field(None, ge=0)
 
 
+class SweetBulkUpdate(SweetUpdate):
+    id: int
+    version: int
+
+
 class SweetResponse(SweetBase):
     id: int
+    version: int
     
     class Config:
         from_attributes = True
 
 
 class QuantityUpdate(BaseModel):
-    quantity: int = Field(..., gt=0)
\ No newline at end of file
+    quantity: int = Field(..., gt=0)
+
+
+class RestockItem(BaseModel):
+    sweet_id: int
+    quantity: int = Field(..., gt=0)
+
+
+class BulkRestock(BaseModel):
+    items: List[RestockItem] = Field(..., min_length=1)
+
+
+class BulkRestockResult(BaseModel):
+    updated: int
+    not_found: List[int]
+
+
+class PriceAdjustment(BaseModel):
+    """Change the price of every sweet matching the filters.
+
+    Exactly one of ``percent`` (e.g. ``-10`` for 10% off) and ``amount``
+    (added to the price) must be given, plus at least one filter.
+    """
+    sweet_ids: List[int] | None = None
+    category: str | None = None
+    name: str | None = None
+    min_price: float | None = Field(None, ge=0)
+    max_price: float | None = Field(None, ge=0)
+    percent: float | None = Field(None, gt=-100)
+    amount: float | None = None
+    
+    @model_validator(mode="after")
+    def check_adjustment(self):
+        if (self.percent is None) == (self.amount is None):
+            raise ValueError("Give exactly one of percent and amount")
+        filters = (self.sweet_ids, self.category, self.name, self.min_price, self.max_price)
+        if all(value is None for value in filters):
+            raise ValueError(
+                "Give at least one of sweet_ids, category, name, min_price and max_price"
+            )
+        return self
+
+
+class PriceAdjustmentResult(BaseModel):
+    updated: int
+    skipped: int
+
+
+class CategoryFacet(BaseModel):
+    category: str
+    count: int
+
+
+class PriceBucket(BaseModel):
+    min_price: float
+    max_price: float
+    count: int
+
+
+class SearchFacets(BaseModel):
+    total: int
+    categories: List[CategoryFacet]
+    price_buckets: List[PriceBucket]
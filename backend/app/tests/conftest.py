@@ -1,31 +1,104 @@
-import pytest
-from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
-
-from app.core.database import Base, get_db
-from app.main import app
+import os
+from functools import lru_cache
+from typing import Optional
+
+# Settings are read when the app is imported, so test overrides come first.
+# The scheduler would otherwise poll the app's own (empty) database.
+os.environ.setdefault("PRICE_SCHEDULER_INTERVAL_SECONDS", "3600")
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import create_engine, event, text  # noqa: E402
+from sqlalchemy.engine import URL, make_url  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from app.core.catalog_index import catalog_index  # noqa: E402
+from app.core.database import Base, get_db  # noqa: E402
+from app.core.idempotency import idempotency_store  # noqa: E402
+from app.core.reservations import reservation_manager  # noqa: E402
+from app.core.revocation import revocation_list  # noqa: E402
+from app.core.security import create_access_token, get_password_hash, pwd_context  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.user import User  # noqa: E402
+
+# Production Argon2 parameters cost ~100 ms per hash; the tests only need
+# the scheme to round-trip.
+pwd_context.update(argon2__memory_cost=1024, argon2__time_cost=1, argon2__parallelism=1)
+
+
+def worker_database_url(url: str, worker: Optional[str]) -> URL:
+    """Give each pytest-xdist worker its own database."""
+    url = make_url(url)
+    if worker is None or url.database in (None, "", ":memory:"):
+        return url
+    if url.get_backend_name() == "sqlite":
+        root, extension = os.path.splitext(url.database)
+        return url.set(database=f"{root}_{worker}{extension}")
+    return url.set(database=f"{url.database}_{worker}")
+
+
+def ensure_database(url: URL):
+    if url.get_backend_name() != "postgresql":
+        return
+    server = create_engine(url.set(database="postgres"), isolation_level="AUTOCOMMIT")
+    with server.connect() as connection:
+        exists = connection.execute(
+            text("SELECT 1 FROM pg_database WHERE datname = :name"), {"name": url.database}
+        ).scalar()
+        if not exists:
+            connection.execute(text(f'CREATE DATABASE "{url.database}"'))
+    server.dispose()
+
+
+SQLALCHEMY_DATABASE_URL = worker_database_url(
+    os.getenv("TEST_DATABASE_URL", "sqlite:///:memory:"), os.getenv("PYTEST_XDIST_WORKER")
+)
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
+if SQLALCHEMY_DATABASE_URL.get_backend_name() == "sqlite":
+    engine = create_engine(
+        SQLALCHEMY_DATABASE_URL,
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False},
-    poolclass=StaticPool,
-)
+    # pysqlite issues its own BEGIN and breaks SAVEPOINT handling; hand
+    # transaction control to SQLAlchemy instead.
+    @event.listens_for(engine, "connect")
+    def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def _begin(connection):
+        connection.exec_driver_sql("BEGIN")
+else:
+    engine = create_engine(SQLALCHEMY_DATABASE_URL)
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
-@pytest.fixture(scope="function")
-def db_session():
+@pytest.fixture(scope="session")
+def database_schema():
+    ensure_database(SQLALCHEMY_DATABASE_URL)
+    Base.metadata.drop_all(bind=engine)
     Base.metadata.create_all(bind=engine)
-    db = TestingSessionLocal()
+    yield
+    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture(scope="function")
+def db_session(database_schema):
+    # Each test runs in one outer transaction that is rolled back afterwards;
+    # commits made by the code under test only release a SAVEPOINT.
+    connection = engine.connect()
+    transaction = connection.begin()
+    db = TestingSessionLocal(bind=connection, join_transaction_mode="create_savepoint")
     try:
         yield db
     finally:
         db.close()
-        Base.metadata.drop_all(bind=engine)
+        transaction.rollback()
+        connection.close()
 
 
 @pytest.fixture(scope="function")
@@ -37,11 +110,40 @@ def client(db_session):
             pass
     
     app.dependency_overrides[get_db] = override_get_db
+    idempotency_store.clear()
+    revocation_list.clear()
+    reservation_manager.clear()
+    if catalog_index is not None:
+        catalog_index.clear()
     with TestClient(app) as test_client:
         yield test_client
     app.dependency_overrides.clear()
 
 
+@lru_cache()
+def hashed_password(password: str) -> str:
+    return get_password_hash(password)
+
+
+def create_test_user(db, user_data: dict, is_admin: bool = False) -> User:
+    """Insert a user directly, skipping registration and password hashing."""
+    user = User(
+        email=user_data["email"],
+        hashed_password=hashed_password(user_data["password"]),
+        full_name=user_data["full_name"],
+        is_admin=is_admin
+    )
+    db.add(user)
+    db.commit()
+    return user
+
+
+def bearer_headers(user: User) -> dict:
+    """Mint an access token with the same claims as ``/auth/login``."""
+    token = create_access_token(data={"sub": user.email, "uid": user.id, "adm": user.is_admin})
+    return {"Authorization": f"Bearer {token}"}
+
+
 @pytest.fixture
 def test_user_data():
     return {
@@ -72,43 +174,10 @@ def test_sweet_data():
 
 
 @pytest.fixture
-def auth_headers(client, test_user_data):
-    client.post("/api/v1/auth/register", json=test_user_data)
-    response = client.post("/api/v1/auth/login", json={
-        "email": test_user_data["email"],
-        "password": test_user_data["password"]
-    })
-    token = response.json()["access_token"]
-    return {"Authorization": f"Bearer {token}"}
+def auth_headers(db_session, test_user_data):
+    return bearer_headers(create_test_user(db_session, test_user_data))
 
 
 @pytest.fixture
-def admin_headers(client, test_admin_data):
-    from app.core.database import get_db
-    from app.models.user import User
-    from app.core.security import get_password_hash
-    
-    db = next(override_get_db())
-    admin_user = User(
-        email=test_admin_data["email"],
-        hashed_password=get_password_hash(test_admin_data["password"]),
-        full_name=test_admin_data["full_name"],
-        is_admin=True
-    )
-    db.add(admin_user)
-    db.commit()
-    
-    response = client.post("/api/v1/auth/login", json={
-        "email": test_admin_data["email"],
-        "password": test_admin_data["password"]
-    })
-    token = response.json()["access_token"]
-    return {"Authorization": f"Bearer {token}"}
-
-
-def override_get_db():
-    db = TestingSessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
\ No newline at end of file
+def admin_headers(db_session, test_admin_data):
+    return bearer_headers(create_test_user(db_session, test_admin_data, is_admin=True))
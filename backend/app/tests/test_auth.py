@@ -96,4 +96,92 @@ class TestProtectedEndpoints:
     
     def test_access_protected_endpoint_with_valid_token(self, client, auth_headers):
         response = client.get("/api/v1/sweets", headers=auth_headers)
-        assert response.status_code == 200
\ No newline at end of file
+        assert response.status_code == 200
+
+class TestTokenRefresh:
+    """Test cases for refresh token rotation."""
+    
+    def login(self, client, test_user_data):
+        client.post("/api/v1/auth/register", json=test_user_data)
+        return client.post("/api/v1/auth/login", json={
+            "email": test_user_data["email"],
+            "password": test_user_data["password"]
+        }).json()
+    
+    def test_login_returns_refresh_token(self, client, test_user_data):
+        tokens = self.login(client, test_user_data)
+
+        assert tokens["refresh_token"]
+    
+    def test_refresh_rotates_tokens(self, client, test_user_data):
+        tokens = self.login(client, test_user_data)
+        
+        response = client.post("/api/v1/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+
+        assert response.status_code == 200
+        data = response.json()
+
+        assert data["refresh_token"] != tokens["refresh_token"]
+        me = client.get("/api/v1/auth/me", headers={"Authorization": f"Bearer {data['access_token']}"})
+        assert me.json()["email"] == test_user_data["email"]
+    
+    def test_reused_refresh_token_revokes_family(self, client, test_user_data):
+        tokens = self.login(client, test_user_data)
+        rotated = client.post("/api/v1/auth/refresh", json={"refresh_token": tokens["refresh_token"]}).json()
+        
+        reuse = client.post("/api/v1/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+
+        assert reuse.status_code == 401
+
+        response = client.post("/api/v1/auth/refresh", json={"refresh_token": rotated["refresh_token"]})
+
+        assert response.status_code == 401
+    
+    def test_refresh_with_unknown_token(self, client):
+        response = client.post("/api/v1/auth/refresh", json={"refresh_token": "not-a-token"})
+
+        assert response.status_code == 401
+
+
+class TestLogout:
+    """Test cases for logout and access token revocation."""
+    
+    def test_logout_revokes_access_token(self, client, auth_headers):
+        response = client.post("/api/v1/auth/logout", headers=auth_headers)
+
+        assert response.status_code == 200
+
+        response = client.get("/api/v1/sweets", headers=auth_headers)
+
+        assert response.status_code == 401
+        assert "revoked" in response.json()["detail"].lower()
+    
+    def test_logout_revokes_refresh_token(self, client, test_user_data):
+        client.post("/api/v1/auth/register", json=test_user_data)
+        tokens = client.post("/api/v1/auth/login", json={
+            "email": test_user_data["email"],
+            "password": test_user_data["password"]
+        }).json()
+        headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+        
+        client.post("/api/v1/auth/logout", json={"refresh_token": tokens["refresh_token"]}, headers=headers)
+        response = client.post("/api/v1/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+
+        assert response.status_code == 401
+    
+    def test_logout_cannot_revoke_another_users_refresh_token(self, client, auth_headers, test_admin_data):
+        client.post("/api/v1/auth/register", json=test_admin_data)
+        tokens = client.post("/api/v1/auth/login", json={
+            "email": test_admin_data["email"],
+            "password": test_admin_data["password"]
+        }).json()
+        
+        client.post("/api/v1/auth/logout", json={"refresh_token": tokens["refresh_token"]}, headers=auth_headers)
+        response = client.post("/api/v1/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+
+        assert response.status_code == 200
+    
+    def test_logout_without_token(self, client):
+        response = client.post("/api/v1/auth/logout")
+
+        assert response.status_code == 401
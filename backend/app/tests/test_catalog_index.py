@@ -0,0 +1,167 @@
+import random
+from types import SimpleNamespace
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from app.core.catalog_index import CatalogIndex, catalog_index  # noqa: E402
+from app.models.sweets import Sweet  # noqa: E402
+
+
+def sweet(sweet_id, name, category, price, quantity=10, version=1):
+    return SimpleNamespace(
+        id=sweet_id, name=name, category=category, price=price, quantity=quantity, version=version
+    )
+
+
+class TestCatalogIndex:
+    """Test cases for the in-memory catalog index."""
+    
+    def build(self):
+        index = CatalogIndex(capacity=4)
+        index.rebuild([
+            sweet(1, "Milk Chocolate", "Chocolate", 1.50),
+            sweet(2, "Dark Chocolate", "Chocolate", 2.75),
+            sweet(3, "Gummy Bears", "Gummy", 0.99),
+            sweet(4, "Sour Worms", "Gummy", 4.20),
+        ])
+        return index
+    
+    def test_filters_by_name_category_and_price(self):
+        index = self.build()
+
+        assert [row["id"] for row in index.search(name="CHOC")] == [1, 2]
+        assert [row["id"] for row in index.search(name="ch")] == [1, 2]
+        assert [row["id"] for row in index.search(category="gum")] == [3, 4]
+        assert [row["id"] for row in index.search(min_price=1.5, max_price=2.75)] == [1, 2]
+        assert [row["id"] for row in index.search(name="chocolate", max_price=2)] == [1]
+        assert index.search(name="caramel") == []
+    
+    def test_upsert_and_remove(self):
+        index = self.build()
+
+        index.upsert(sweet(2, "Dark Caramel", "Caramel", 3.10, version=2))
+        index.upsert(sweet(5, "Salted Caramel", "Caramel", 1.25))
+        index.remove(4)
+
+        assert [row["id"] for row in index.search(name="caramel")] == [2, 5]
+        assert [row["id"] for row in index.search(name="chocolate")] == [1]
+        assert index.search(category="caramel")[0] == {
+            "id": 2, "name": "Dark Caramel", "category": "Caramel", "price": 3.10, "quantity": 10, "version": 2
+        }
+        assert [row["id"] for row in index.all()] == [1, 2, 3, 5]
+    
+    def test_out_of_order_upserts_keep_newest_version(self):
+        index = self.build()
+
+        index.upsert(sweet(2, "Dark Chocolate", "Chocolate", 2.75, quantity=7, version=3))
+        index.upsert(sweet(2, "Dark Chocolate", "Chocolate", 2.75, quantity=8, version=2))
+
+        assert index.search(name="dark")[0]["quantity"] == 7
+        assert index.search(name="dark")[0]["version"] == 3
+    
+    def test_grows_and_compacts(self):
+        index = CatalogIndex(capacity=4)
+        index.rebuild([])
+
+        for sweet_id in range(1, 101):
+            index.upsert(sweet(sweet_id, f"Sweet {sweet_id}", "Toffee", float(sweet_id)))
+        for sweet_id in range(1, 91):
+            index.remove(sweet_id)
+
+        assert len(index) == 10
+        assert [row["id"] for row in index.search(name="sweet 9")] == [91, 92, 93, 94, 95, 96, 97, 98, 99]
+        assert [row["id"] for row in index.search(min_price=99)] == [99, 100]
+    
+    def test_updates_ignored_until_rebuilt(self):
+        index = CatalogIndex()
+
+        index.upsert(sweet(1, "Fudge", "Fudge", 2.0))
+
+        assert not index.ready
+        assert len(index) == 0
+    
+    def test_diff_reports_drift(self):
+        index = self.build()
+        truth = [
+            sweet(1, "Milk Chocolate", "Chocolate", 1.50),
+            sweet(2, "Dark Chocolate", "Chocolate", 2.75, quantity=9),
+            sweet(3, "Gummy Bears", "Gummy", 0.99),
+            sweet(5, "Fudge", "Fudge", 2.00),
+        ]
+
+        assert index.diff(truth) == [2, 4, 5]
+
+
+class TestCatalogIndexEndpoints:
+    """Test cases for catalog reads served from the index."""
+    
+    @pytest.fixture
+    def indexed(self, client, db_session, monkeypatch):
+        from app.api.routes import sweets
+
+        monkeypatch.setattr(sweets.settings, "catalog_index_enabled", True)
+        catalog_index.rebuild(db_session.query(Sweet).all())
+        return catalog_index
+    
+    def test_handlers_keep_index_in_sync(self, client, indexed, admin_headers, test_sweet_data):
+        created = client.post("/api/v1/sweets", json=test_sweet_data, headers=admin_headers).json()
+        other = client.post(
+            "/api/v1/sweets",
+            json={"name": "Gummy Bears", "category": "Gummy", "price": 1.25, "quantity": 5},
+            headers=admin_headers
+        ).json()
+        client.put(f"/api/v1/sweets/{created['id']}", json={"price": 3.49}, headers=admin_headers)
+        client.post(f"/api/v1/sweets/{created['id']}/purchase", json={"quantity": 3}, headers=admin_headers)
+        client.post(f"/api/v1/sweets/{created['id']}/restock", json={"quantity": 10}, headers=admin_headers)
+        client.delete(f"/api/v1/sweets/{other['id']}", headers=admin_headers)
+
+        assert indexed.search() == [{
+            **created, "price": 3.49, "quantity": test_sweet_data["quantity"] + 7, "version": 4
+        }]
+        response = client.get("/api/v1/admin/catalog-index", headers=admin_headers)
+        assert response.json() == {"enabled": True, "ready": True, "rows": 1, "mismatched_ids": []}
+    
+    def test_clock_moves_after_index_update(self, client, indexed, admin_headers, test_sweet_data, monkeypatch):
+        from app.api.routes import sweets
+
+        seen = []
+        touch = sweets.catalog_clock.touch
+        monkeypatch.setattr(sweets.catalog_clock, "touch", lambda: seen.append(indexed.search()) or touch())
+        
+        created = client.post("/api/v1/sweets", json=test_sweet_data, headers=admin_headers).json()
+
+        assert seen == [[created]]
+    
+    def test_search_matches_sql(self, client, db_session, indexed, auth_headers, monkeypatch):
+        from app.api.routes import sweets
+
+        rng = random.Random(7)
+        words = ["Milk", "Dark", "Sour", "Mint", "Choco", "Gummy", "Berry", "Toffee"]
+        categories = ["Chocolate", "Gummy", "Hard Candy", "Toffee"]
+        for _ in range(60):
+            client.post("/api/v1/sweets", json={
+                "name": " ".join(rng.sample(words, 2)),
+                "category": rng.choice(categories),
+                "price": round(rng.uniform(0.5, 10), 2),
+                "quantity": rng.randint(0, 50)
+            }, headers=auth_headers)
+        queries = [
+            {"name": rng.choice(["mi", "choco", "ry t", "dark", "x"]), "max_price": rng.choice([3, 6, 10])}
+            for _ in range(10)
+        ] + [
+            {"category": rng.choice(["candy", "gum", "CHOC"]), "min_price": rng.uniform(0, 5)}
+            for _ in range(10)
+        ]
+
+        from_index = [
+            client.get("/api/v1/sweets/search", params=params, headers=auth_headers).json() for params in queries
+        ]
+        monkeypatch.setattr(sweets.settings, "catalog_index_enabled", False)
+        from_sql = [
+            client.get("/api/v1/sweets/search", params=params, headers=auth_headers).json() for params in queries
+        ]
+
+        assert from_index == from_sql
+        assert any(from_index)
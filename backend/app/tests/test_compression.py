@@ -0,0 +1,150 @@
+import gzip
+import json
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.core.catalog import catalog_clock
+from app.core.compression import CompressionMiddleware, negotiate_encoding
+
+
+def build_app():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=100)
+
+    @app.get("/small")
+    def small():
+        return PlainTextResponse("tiny")
+
+    @app.get("/large")
+    def large():
+        return PlainTextResponse("sweet " * 1000)
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse(
+            (json.dumps({"id": index}) + "\n" for index in range(200)),
+            media_type="application/x-ndjson"
+        )
+
+    return app
+
+
+class TestCompressionMiddleware:
+    """Test cases for response compression."""
+    
+    def test_negotiates_gzip(self):
+        assert negotiate_encoding("gzip, deflate") == "gzip"
+        assert negotiate_encoding("gzip;q=0, identity") is None
+        assert negotiate_encoding("") is None
+    
+    def test_small_response_is_not_compressed(self):
+        client = TestClient(build_app())
+        
+        response = client.get("/small", headers={"Accept-Encoding": "gzip"})
+
+        assert "content-encoding" not in response.headers
+        assert response.text == "tiny"
+    
+    def test_large_response_is_compressed(self):
+        client = TestClient(build_app())
+        
+        response = client.get("/large", headers={"Accept-Encoding": "gzip"})
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert int(response.headers["content-length"]) < 6000
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert response.text == "sweet " * 1000
+    
+    def test_streaming_response_is_compressed_incrementally(self):
+        client = TestClient(build_app())
+        
+        with client.stream("GET", "/stream", headers={"Accept-Encoding": "gzip"}) as response:
+            raw = b"".join(response.iter_raw())
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert "content-length" not in response.headers
+        lines = gzip.decompress(raw).decode().splitlines()
+        assert len(lines) == 200
+        assert json.loads(lines[-1]) == {"id": 199}
+    
+    def test_identity_when_not_accepted(self):
+        client = TestClient(build_app())
+        
+        response = client.get("/large", headers={"Accept-Encoding": "identity"})
+
+        assert "content-encoding" not in response.headers
+
+
+class TestConditionalCatalogRequests:
+    """Test cases for ETag/Last-Modified on catalog reads."""
+    
+    def test_unchanged_catalog_returns_304(self, client, auth_headers, test_sweet_data):
+        client.post("/api/v1/sweets", json=test_sweet_data, headers=auth_headers)
+        first = client.get("/api/v1/sweets", headers=auth_headers)
+        
+        response = client.get("/api/v1/sweets", headers={**auth_headers, "If-None-Match": first.headers["etag"]})
+
+        assert response.status_code == 304
+        assert response.headers["etag"] == first.headers["etag"]
+    
+    def test_if_modified_since(self, client, auth_headers, monkeypatch):
+        later = datetime.now(timezone.utc) + timedelta(seconds=5)
+        monkeypatch.setattr(catalog_clock, "_clock", lambda: later)
+        first = client.get("/api/v1/sweets/search?name=choc", headers=auth_headers)
+        
+        response = client.get(
+            "/api/v1/sweets/search?name=choc",
+            headers={**auth_headers, "If-Modified-Since": first.headers["last-modified"]}
+        )
+
+        assert response.status_code == 304
+    
+    def test_same_second_write_is_not_hidden(self, client, auth_headers, test_sweet_data):
+        client.post("/api/v1/sweets", json=test_sweet_data, headers=auth_headers)
+        first = client.get("/api/v1/sweets", headers=auth_headers)
+        since = format_datetime(datetime.now(timezone.utc), usegmt=True)
+        client.post("/api/v1/sweets", json={**test_sweet_data, "name": "Fudge"}, headers=auth_headers)
+        
+        response = client.get("/api/v1/sweets", headers={**auth_headers, "If-Modified-Since": since})
+
+        assert "last-modified" not in first.headers
+        assert response.status_code == 200
+        assert len(response.json()) == 2
+    
+    def test_catalog_change_invalidates_etag(self, client, auth_headers, test_sweet_data):
+        sweet_id = client.post("/api/v1/sweets", json=test_sweet_data, headers=auth_headers).json()["id"]
+        first = client.get("/api/v1/sweets", headers=auth_headers)
+        client.post(f"/api/v1/sweets/{sweet_id}/purchase", json={"quantity": 1}, headers=auth_headers)
+        
+        response = client.get("/api/v1/sweets", headers={**auth_headers, "If-None-Match": first.headers["etag"]})
+
+        assert response.status_code == 200
+        assert response.headers["etag"] != first.headers["etag"]
+        assert response.json()[0]["quantity"] == test_sweet_data["quantity"] - 1
+    
+    def test_reads_after_a_write_do_not_join_older_loads(self, client, auth_headers, test_sweet_data, monkeypatch):
+        from app.api.routes import sweets
+
+        keys = []
+        do = sweets.catalog_flight.do
+        monkeypatch.setattr(sweets.catalog_flight, "do", lambda key, fn: keys.append(key) or do(key, fn))
+        client.get("/api/v1/sweets", headers=auth_headers)
+        client.post("/api/v1/sweets", json=test_sweet_data, headers=auth_headers)
+        
+        response = client.get("/api/v1/sweets", headers=auth_headers)
+
+        assert keys[0] != keys[1]
+        assert response.headers["etag"].endswith(f'-{keys[1][1]}"')
+    
+    def test_export_streams_ndjson(self, client, auth_headers, test_sweet_data):
+        client.post("/api/v1/sweets", json=test_sweet_data, headers=auth_headers)
+        
+        response = client.get("/api/v1/sweets/export", headers=auth_headers)
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        assert json.loads(response.text.splitlines()[0])["name"] == test_sweet_data["name"]
@@ -0,0 +1,24 @@
+from sqlalchemy import create_engine, inspect, text
+
+from app.core.database import upgrade_schema
+
+
+class TestUpgradeSchema:
+    """Test cases for adding new columns to existing databases."""
+    
+    def test_adds_version_to_existing_sweets_table(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+        with engine.begin() as conn:
+            conn.execute(text(
+                "CREATE TABLE sweets (id INTEGER PRIMARY KEY, name VARCHAR, category VARCHAR, "
+                "price FLOAT, quantity INTEGER)"
+            ))
+            conn.execute(text("INSERT INTO sweets VALUES (1, 'Fudge', 'Fudge', 2.5, 10)"))
+        
+        upgrade_schema(engine)
+        upgrade_schema(engine)
+
+        assert "version" in {column["name"] for column in inspect(engine).get_columns("sweets")}
+        with engine.connect() as conn:
+            assert conn.execute(text("SELECT version FROM sweets")).scalar() == 1
+        engine.dispose()
@@ -0,0 +1,96 @@
+from datetime import datetime, timedelta
+
+
+class TestSearchFacets:
+    """Test cases for faceted search counts."""
+    
+    def seed(self, client, headers):
+        sweets = [
+            {"name": "Milk Chocolate", "category": "Chocolate", "price": 1.50, "quantity": 10},
+            {"name": "Dark Chocolate", "category": "Chocolate", "price": 2.75, "quantity": 10},
+            {"name": "White Chocolate", "category": "Chocolate", "price": 2.10, "quantity": 10},
+            {"name": "Gummy Bears", "category": "Gummy", "price": 0.99, "quantity": 10},
+            {"name": "Sour Worms", "category": "Gummy", "price": 4.20, "quantity": 10},
+        ]
+        return [client.post("/api/v1/sweets", json=sweet, headers=headers).json()["id"] for sweet in sweets]
+    
+    def test_facets_for_whole_catalog(self, client, auth_headers):
+        self.seed(client, auth_headers)
+        
+        response = client.get("/api/v1/sweets/search/facets", headers=auth_headers)
+
+        assert response.status_code == 200
+        data = response.json()
+
+        assert data["total"] == 5
+        assert data["categories"] == [
+            {"category": "Chocolate", "count": 3},
+            {"category": "Gummy", "count": 2}
+        ]
+        assert data["price_buckets"] == [
+            {"min_price": 0.0, "max_price": 1.0, "count": 1},
+            {"min_price": 1.0, "max_price": 2.0, "count": 1},
+            {"min_price": 2.0, "max_price": 3.0, "count": 2},
+            {"min_price": 4.0, "max_price": 5.0, "count": 1}
+        ]
+    
+    def test_facets_respect_filters_and_bucket_size(self, client, auth_headers):
+        self.seed(client, auth_headers)
+        
+        response = client.get(
+            "/api/v1/sweets/search/facets?name=chocolate&max_price=2.5&bucket_size=2",
+            headers=auth_headers
+        )
+        data = response.json()
+
+        assert data["total"] == 2
+        assert data["categories"] == [{"category": "Chocolate", "count": 2}]
+        assert data["price_buckets"] == [
+            {"min_price": 0.0, "max_price": 2.0, "count": 1},
+            {"min_price": 2.0, "max_price": 4.0, "count": 1}
+        ]
+    
+    def test_fractional_bucket_bounds_are_rounded(self, client, auth_headers):
+        self.seed(client, auth_headers)
+        
+        response = client.get("/api/v1/sweets/search/facets?name=dark&bucket_size=0.1", headers=auth_headers)
+
+        assert response.json()["price_buckets"] == [{"min_price": 2.7, "max_price": 2.8, "count": 1}]
+    
+    def test_boundary_prices_land_in_their_own_bucket(self, client, auth_headers):
+        for price in (0.3, 0.7, 2.9):
+            client.post(
+                "/api/v1/sweets",
+                json={"name": f"Drop {price}", "category": "Hard Candy", "price": price, "quantity": 1},
+                headers=auth_headers
+            )
+        
+        response = client.get("/api/v1/sweets/search/facets?bucket_size=0.1", headers=auth_headers)
+
+        assert response.json()["price_buckets"] == [
+            {"min_price": 0.3, "max_price": 0.4, "count": 1},
+            {"min_price": 0.7, "max_price": 0.8, "count": 1},
+            {"min_price": 2.9, "max_price": 3.0, "count": 1}
+        ]
+    
+    def test_facets_at_point_in_time(self, client, admin_headers):
+        sweet_ids = self.seed(client, admin_headers)
+        starts = datetime.utcnow() + timedelta(days=1)
+        client.post(
+            f"/api/v1/sweets/{sweet_ids[0]}/prices",
+            json={"price": 4.50, "effective_from": starts.isoformat()},
+            headers=admin_headers
+        )
+        
+        response = client.get(
+            "/api/v1/sweets/search/facets",
+            params={"min_price": 4, "price_at": (starts + timedelta(hours=1)).isoformat()},
+            headers=admin_headers
+        )
+
+        assert response.json()["total"] == 2
+    
+    def test_facets_invalid_bucket_size(self, client, auth_headers):
+        response = client.get("/api/v1/sweets/search/facets?bucket_size=0", headers=auth_headers)
+
+        assert response.status_code == 422
@@ -0,0 +1,130 @@
+import threading
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.idempotency import IdempotencyStore
+
+
+class TestIdempotencyStore:
+    """Test cases for the idempotency response store."""
+    
+    def test_replays_stored_response(self):
+        store = IdempotencyStore()
+        calls = []
+        
+        first = store.execute("key", {"quantity": 1}, lambda: calls.append(1) or "done")
+        second = store.execute("key", {"quantity": 1}, lambda: calls.append(1) or "again")
+
+        assert first == ("done", False)
+        assert second == ("done", True)
+        assert len(calls) == 1
+    
+    def test_rejects_key_reuse_with_different_payload(self):
+        store = IdempotencyStore()
+        store.execute("key", {"quantity": 1}, lambda: "done")
+
+        with pytest.raises(HTTPException) as exc_info:
+            store.execute("key", {"quantity": 2}, lambda: "done")
+
+        assert exc_info.value.status_code == 422
+    
+    def test_entries_expire_and_evict(self):
+        now = [0.0]
+        store = IdempotencyStore(max_entries=2, ttl_seconds=10, clock=lambda: now[0])
+        for key in ("a", "b", "c"):
+            store.execute(key, {}, lambda: key)
+
+        assert len(store) == 2
+        assert store.execute("a", {}, lambda: "fresh") == ("fresh", False)
+
+        now[0] = 11.0
+
+        assert store.execute("c", {}, lambda: "expired") == ("expired", False)
+    
+    def test_failed_handler_is_not_stored(self):
+        store = IdempotencyStore()
+
+        def fail():
+            raise HTTPException(status_code=400, detail="boom")
+
+        with pytest.raises(HTTPException):
+            store.execute("key", {}, fail)
+
+        assert store.execute("key", {}, lambda: "retried") == ("retried", False)
+    
+    def test_concurrent_duplicates_execute_once(self):
+        store = IdempotencyStore()
+        calls = []
+        results = []
+
+        def handler():
+            calls.append(1)
+            time.sleep(0.05)
+            return "done"
+
+        def worker():
+            results.append(store.execute("key", {}, handler))
+
+        threads = [threading.Thread(target=worker) for _ in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+        assert sorted(replayed for _, replayed in results) == [False] + [True] * 19
+        assert all(body == "done" for body, _ in results)
+
+
+class TestIdempotentEndpoints:
+    """Test cases for Idempotency-Key handling on write endpoints."""
+    
+    def test_purchase_retry_does_not_double_decrement(self, client, auth_headers, test_sweet_data):
+        sweet_id = client.post("/api/v1/sweets", json=test_sweet_data, headers=auth_headers).json()["id"]
+        headers = {**auth_headers, "Idempotency-Key": "purchase-1"}
+        
+        first = client.post(f"/api/v1/sweets/{sweet_id}/purchase", json={"quantity": 5}, headers=headers)
+        second = client.post(f"/api/v1/sweets/{sweet_id}/purchase", json={"quantity": 5}, headers=headers)
+
+        assert first.status_code == 200
+        assert second.status_code == 200
+        assert second.json() == first.json()
+        assert second.headers["idempotent-replayed"] == "true"
+
+        sweets = client.get("/api/v1/sweets", headers=auth_headers).json()
+
+        assert sweets[0]["quantity"] == test_sweet_data["quantity"] - 5
+    
+    def test_create_retry_creates_one_sweet(self, client, auth_headers, test_sweet_data):
+        headers = {**auth_headers, "Idempotency-Key": "create-1"}
+        
+        first = client.post("/api/v1/sweets", json=test_sweet_data, headers=headers)
+        second = client.post("/api/v1/sweets", json=test_sweet_data, headers=headers)
+
+        assert first.status_code == 201
+        assert second.status_code == 201
+        assert second.json()["id"] == first.json()["id"]
+        assert len(client.get("/api/v1/sweets", headers=auth_headers).json()) == 1
+    
+    def test_restock_key_reused_with_different_body(self, client, admin_headers, test_sweet_data):
+        sweet_id = client.post("/api/v1/sweets", json=test_sweet_data, headers=admin_headers).json()["id"]
+        headers = {**admin_headers, "Idempotency-Key": "restock-1"}
+        client.post(f"/api/v1/sweets/{sweet_id}/restock", json={"quantity": 10}, headers=headers)
+        
+        response = client.post(f"/api/v1/sweets/{sweet_id}/restock", json={"quantity": 20}, headers=headers)
+
+        assert response.status_code == 422
+    
+    def test_failed_purchase_is_not_replayed(self, client, auth_headers, test_sweet_data):
+        test_sweet_data["quantity"] = 3
+        sweet_id = client.post("/api/v1/sweets", json=test_sweet_data, headers=auth_headers).json()["id"]
+        headers = {**auth_headers, "Idempotency-Key": "purchase-2"}
+        client.post(f"/api/v1/sweets/{sweet_id}/purchase", json={"quantity": 5}, headers=headers)
+        client.put(f"/api/v1/sweets/{sweet_id}", json={"quantity": 10}, headers=auth_headers)
+        
+        response = client.post(f"/api/v1/sweets/{sweet_id}/purchase", json={"quantity": 5}, headers=headers)
+
+        assert response.status_code == 200
+        assert response.json()["quantity"] == 5
@@ -0,0 +1,70 @@
+class TestOrders:
+    """Test cases for order history."""
+    
+    def test_purchase_records_order(self, client, auth_headers, test_sweet_data):
+        sweet_id = client.post("/api/v1/sweets", json=test_sweet_data, headers=auth_headers).json()["id"]
+        client.post(f"/api/v1/sweets/{sweet_id}/purchase", json={"quantity": 3}, headers=auth_headers)
+        
+        response = client.get("/api/v1/orders", headers=auth_headers)
+
+        assert response.status_code == 200
+        data = response.json()
+
+        assert len(data["items"]) == 1
+        assert data["next_cursor"] is None
+        order = data["items"][0]
+        assert order["total"] == round(test_sweet_data["price"] * 3, 2)
+        assert order["lines"] == [{
+            "sweet_id": sweet_id,
+            "sweet_name": test_sweet_data["name"],
+            "unit_price": test_sweet_data["price"],
+            "quantity": 3
+        }]
+    
+    def test_failed_purchase_records_nothing(self, client, auth_headers, test_sweet_data):
+        sweet_id = client.post("/api/v1/sweets", json=test_sweet_data, headers=auth_headers).json()["id"]
+        client.post(f"/api/v1/sweets/{sweet_id}/purchase", json={"quantity": 1000}, headers=auth_headers)
+        
+        response = client.get("/api/v1/orders", headers=auth_headers)
+
+        assert response.json()["items"] == []
+    
+    def test_orders_paginate_newest_first(self, client, auth_headers, test_sweet_data):
+        sweet_id = client.post("/api/v1/sweets", json=test_sweet_data, headers=auth_headers).json()["id"]
+        for quantity in range(1, 6):
+            client.post(f"/api/v1/sweets/{sweet_id}/purchase", json={"quantity": quantity}, headers=auth_headers)
+        
+        quantities = []
+        cursor = None
+        pages = 0
+        while True:
+            params = {"limit": 2}
+            if cursor:
+                params["cursor"] = cursor
+            data = client.get("/api/v1/orders", params=params, headers=auth_headers).json()
+            quantities.extend(order["lines"][0]["quantity"] for order in data["items"])
+            pages += 1
+            cursor = data["next_cursor"]
+            if cursor is None:
+                break
+
+        assert pages == 3
+        assert quantities == [5, 4, 3, 2, 1]
+    
+    def test_orders_are_scoped_to_user(self, client, auth_headers, admin_headers, test_sweet_data):
+        sweet_id = client.post("/api/v1/sweets", json=test_sweet_data, headers=auth_headers).json()["id"]
+        client.post(f"/api/v1/sweets/{sweet_id}/purchase", json={"quantity": 1}, headers=auth_headers)
+        
+        response = client.get("/api/v1/orders", headers=admin_headers)
+
+        assert response.json()["items"] == []
+    
+    def test_invalid_cursor(self, client, auth_headers):
+        response = client.get("/api/v1/orders?cursor=garbage", headers=auth_headers)
+
+        assert response.status_code == 400
+    
+    def test_orders_without_auth(self, client):
+        response = client.get("/api/v1/orders")
+
+        assert response.status_code == 401
@@ -0,0 +1,117 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy.orm import sessionmaker
+
+from app.core.pricing import PriceScheduler, apply_due_price_changes
+
+
+def create_sweet(client, headers, sweet_data):
+    return client.post("/api/v1/sweets", json=sweet_data, headers=headers).json()["id"]
+
+
+class TestPriceHistory:
+    """Test cases for price history and scheduled price changes."""
+    
+    def test_create_and_update_record_history(self, client, admin_headers, test_sweet_data):
+        sweet_id = create_sweet(client, admin_headers, test_sweet_data)
+        client.put(f"/api/v1/sweets/{sweet_id}", json={"price": 3.49}, headers=admin_headers)
+        
+        response = client.get(f"/api/v1/sweets/{sweet_id}/prices", headers=admin_headers)
+
+        assert response.status_code == 200
+        history = response.json()
+
+        assert [entry["price"] for entry in history] == [test_sweet_data["price"], 3.49]
+        assert history[0]["effective_to"] == history[1]["effective_from"]
+        assert history[1]["effective_to"] is None
+        assert all(entry["applied"] for entry in history)
+    
+    def test_scheduled_change_applies_when_due(self, client, db_session, admin_headers, test_sweet_data):
+        sweet_id = create_sweet(client, admin_headers, test_sweet_data)
+        starts = datetime.utcnow() + timedelta(days=1)
+        
+        response = client.post(
+            f"/api/v1/sweets/{sweet_id}/prices",
+            json={"price": 1.99, "effective_from": starts.isoformat()},
+            headers=admin_headers
+        )
+
+        assert response.status_code == 201
+        assert response.json()["applied"] is False
+        assert client.get("/api/v1/sweets", headers=admin_headers).json()[0]["price"] == test_sweet_data["price"]
+
+        later = (starts + timedelta(hours=1)).isoformat()
+        price = client.get(f"/api/v1/sweets/{sweet_id}/price", params={"at": later}, headers=admin_headers)
+
+        assert price.json()["price"] == 1.99
+
+        assert apply_due_price_changes(db_session, starts + timedelta(minutes=1)) == [sweet_id]
+        assert client.get("/api/v1/sweets", headers=admin_headers).json()[0]["price"] == 1.99
+    
+    def test_back_dated_change_keeps_current_price(self, client, admin_headers, test_sweet_data):
+        sweet_id = create_sweet(client, admin_headers, test_sweet_data)
+        client.put(f"/api/v1/sweets/{sweet_id}", json={"price": 3.49}, headers=admin_headers)
+        history = client.get(f"/api/v1/sweets/{sweet_id}/prices", headers=admin_headers).json()
+        between = datetime.fromisoformat(history[0]["effective_from"]) + (
+            datetime.fromisoformat(history[1]["effective_from"]) - datetime.fromisoformat(history[0]["effective_from"])
+        ) / 2
+        
+        client.post(
+            f"/api/v1/sweets/{sweet_id}/prices",
+            json={"price": 9.99, "effective_from": between.isoformat()},
+            headers=admin_headers
+        )
+
+        assert client.get("/api/v1/sweets", headers=admin_headers).json()[0]["price"] == 3.49
+    
+    def test_search_by_price_at_time(self, client, admin_headers, test_sweet_data):
+        sweet_id = create_sweet(client, admin_headers, test_sweet_data)
+        starts = datetime.utcnow() + timedelta(days=1)
+        client.post(
+            f"/api/v1/sweets/{sweet_id}/prices",
+            json={"price": 5.00, "effective_from": starts.isoformat()},
+            headers=admin_headers
+        )
+        
+        now_results = client.get("/api/v1/sweets/search?min_price=4", headers=admin_headers).json()
+        future_results = client.get(
+            "/api/v1/sweets/search",
+            params={"min_price": 4, "price_at": (starts + timedelta(hours=1)).isoformat()},
+            headers=admin_headers
+        ).json()
+
+        assert now_results == []
+        assert [sweet["id"] for sweet in future_results] == [sweet_id]
+    
+    def test_schedule_as_regular_user(self, client, auth_headers, test_sweet_data):
+        sweet_id = create_sweet(client, auth_headers, test_sweet_data)
+        
+        response = client.post(
+            f"/api/v1/sweets/{sweet_id}/prices",
+            json={"price": 1.99, "effective_from": datetime.utcnow().isoformat()},
+            headers=auth_headers
+        )
+
+        assert response.status_code == 403
+    
+    def test_price_at_for_nonexistent_sweet(self, client, auth_headers):
+        response = client.get("/api/v1/sweets/99999/price", params={"at": datetime.utcnow().isoformat()}, headers=auth_headers)
+
+        assert response.status_code == 404
+    
+    def test_scheduler_reports_applied_sweets(self, client, db_session, admin_headers, test_sweet_data):
+        sweet_id = create_sweet(client, admin_headers, test_sweet_data)
+        starts = datetime.utcnow() + timedelta(hours=1)
+        client.post(
+            f"/api/v1/sweets/{sweet_id}/prices",
+            json={"price": 1.49, "effective_from": starts.isoformat()},
+            headers=admin_headers
+        )
+        applied = []
+        scheduler = PriceScheduler(sessionmaker(bind=db_session.get_bind()), on_applied=lambda db, sweet_ids: applied.extend(sweet_ids))
+
+        assert scheduler.run_once(datetime.utcnow()) == []
+
+        scheduler.run_once(starts)
+
+        assert applied == [sweet_id]
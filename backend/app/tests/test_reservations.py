@@ -0,0 +1,186 @@
+import random
+import threading
+
+import pytest
+
+from app.core.reservations import InsufficientStock, ReservationManager, TimingWheel
+
+
+class TestTimingWheel:
+    """Test cases for the expiry timing wheel."""
+    
+    def test_expires_items_when_deadline_passes(self):
+        wheel = TimingWheel(tick_seconds=1, slot_count=8)
+        wheel.schedule(1, 2.5)
+        wheel.schedule(2, 5.0)
+
+        assert wheel.advance(2.0) == []
+        assert wheel.advance(3.0) == [1]
+        assert wheel.advance(5.0) == [2]
+        assert len(wheel) == 0
+    
+    def test_deadlines_beyond_one_revolution(self):
+        wheel = TimingWheel(tick_seconds=1, slot_count=8)
+        wheel.schedule(1, 20.0)
+
+        assert wheel.advance(12.0) == []
+        assert wheel.advance(20.0) == [1]
+    
+    def test_cancel(self):
+        wheel = TimingWheel(tick_seconds=1, slot_count=8)
+        wheel.schedule(1, 2.0)
+        wheel.cancel(1)
+
+        assert wheel.advance(10.0) == []
+    
+    def test_long_idle_gap_expires_everything_due(self):
+        wheel = TimingWheel(tick_seconds=1, slot_count=8)
+        for item_id in range(100):
+            wheel.schedule(item_id, float(item_id))
+
+        assert sorted(wheel.advance(1_000_000.0)) == list(range(100))
+
+
+class TestReservationManager:
+    """Test cases for in-process stock holds."""
+    
+    def test_holds_reduce_available_stock(self):
+        manager = ReservationManager(clock=lambda: 0.0)
+        manager.reserve(user_id=1, sweet_id=7, quantity=6, ttl_seconds=60, stock=10)
+
+        assert manager.held(7) == 6
+        with pytest.raises(InsufficientStock):
+            manager.reserve(user_id=2, sweet_id=7, quantity=5, ttl_seconds=60, stock=10)
+    
+    def test_release_and_ownership(self):
+        manager = ReservationManager(clock=lambda: 0.0)
+        reservation = manager.reserve(user_id=1, sweet_id=7, quantity=3, ttl_seconds=60, stock=10)
+
+        assert not manager.release(reservation.id, user_id=2)
+        assert manager.release(reservation.id, user_id=1)
+        assert manager.held(7) == 0
+    
+    def test_thousands_of_holds_expire(self):
+        now = [0.0]
+        manager = ReservationManager(clock=lambda: now[0])
+        rng = random.Random(7)
+        ttls = [rng.randint(1, 900) for _ in range(5000)]
+        for index, ttl in enumerate(ttls):
+            manager.reserve(user_id=index, sweet_id=index % 10, quantity=1, ttl_seconds=ttl, stock=10_000)
+
+        now[0] = 450.0
+
+        assert len(manager) == sum(ttl > 450 for ttl in ttls)
+        assert sum(manager.held(sweet_id) for sweet_id in range(10)) == len(manager)
+
+        now[0] = 901.0
+
+        assert len(manager) == 0
+        assert all(manager.held(sweet_id) == 0 for sweet_id in range(10))
+    
+    def test_concurrent_holds_never_exceed_stock(self):
+        manager = ReservationManager()
+        granted = []
+
+        def worker(user_id):
+            for _ in range(100):
+                try:
+                    manager.reserve(user_id=user_id, sweet_id=1, quantity=1, ttl_seconds=600, stock=3000)
+                    granted.append(1)
+                except InsufficientStock:
+                    pass
+
+        threads = [threading.Thread(target=worker, args=(user_id,)) for user_id in range(50)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(granted) == 3000
+        assert manager.held(1) == 3000
+
+
+class TestReservationEndpoints:
+    """Test cases for the reservation API."""
+    
+    def test_reservation_blocks_purchase(self, client, auth_headers, test_sweet_data):
+        test_sweet_data["quantity"] = 10
+        sweet_id = client.post("/api/v1/sweets", json=test_sweet_data, headers=auth_headers).json()["id"]
+        
+        response = client.post("/api/v1/reservations", json={"sweet_id": sweet_id, "quantity": 8}, headers=auth_headers)
+
+        assert response.status_code == 201
+        assert response.json()["quantity"] == 8
+
+        purchase = client.post(f"/api/v1/sweets/{sweet_id}/purchase", json={"quantity": 3}, headers=auth_headers)
+
+        assert purchase.status_code == 400
+    
+    def test_confirm_reservation_creates_order(self, client, auth_headers, test_sweet_data):
+        sweet_id = client.post("/api/v1/sweets", json=test_sweet_data, headers=auth_headers).json()["id"]
+        reservation_id = client.post("/api/v1/reservations", json={"sweet_id": sweet_id, "quantity": 4}, headers=auth_headers).json()["id"]
+        
+        response = client.post(f"/api/v1/reservations/{reservation_id}/confirm", headers=auth_headers)
+
+        assert response.status_code == 200
+        assert response.json()["lines"][0]["quantity"] == 4
+
+        sweets = client.get("/api/v1/sweets", headers=auth_headers).json()
+
+        assert sweets[0]["quantity"] == test_sweet_data["quantity"] - 4
+        assert client.post(f"/api/v1/reservations/{reservation_id}/confirm", headers=auth_headers).status_code == 404
+    
+    def test_release_reservation(self, client, auth_headers, test_sweet_data):
+        test_sweet_data["quantity"] = 5
+        sweet_id = client.post("/api/v1/sweets", json=test_sweet_data, headers=auth_headers).json()["id"]
+        reservation_id = client.post("/api/v1/reservations", json={"sweet_id": sweet_id, "quantity": 5}, headers=auth_headers).json()["id"]
+        
+        response = client.delete(f"/api/v1/reservations/{reservation_id}", headers=auth_headers)
+
+        assert response.status_code == 200
+
+        purchase = client.post(f"/api/v1/sweets/{sweet_id}/purchase", json={"quantity": 5}, headers=auth_headers)
+
+        assert purchase.status_code == 200
+    
+    def test_reserve_more_than_available(self, client, auth_headers, test_sweet_data):
+        sweet_id = client.post("/api/v1/sweets", json=test_sweet_data, headers=auth_headers).json()["id"]
+        
+        response = client.post("/api/v1/reservations", json={"sweet_id": sweet_id, "quantity": 1000}, headers=auth_headers)
+
+        assert response.status_code == 400
+    
+    def test_reserve_nonexistent_sweet(self, client, auth_headers):
+        response = client.post("/api/v1/reservations", json={"sweet_id": 99999, "quantity": 1}, headers=auth_headers)
+
+        assert response.status_code == 404
+    
+    def test_reservations_and_purchases_wait_for_stock_lock(self, client, auth_headers, test_sweet_data):
+        from app.core.reservations import reservation_manager
+
+        sweet_id = client.post("/api/v1/sweets", json=test_sweet_data, headers=auth_headers).json()["id"]
+        requests = [
+            ("/api/v1/reservations", {"sweet_id": sweet_id, "quantity": 1}),
+            (f"/api/v1/sweets/{sweet_id}/purchase", {"quantity": 1}),
+        ]
+        
+        for path, body in requests:
+            statuses = []
+            thread = threading.Thread(
+                target=lambda: statuses.append(client.post(path, json=body, headers=auth_headers).status_code)
+            )
+            with reservation_manager.stock_lock(sweet_id):
+                thread.start()
+                thread.join(0.2)
+                assert thread.is_alive()
+            thread.join()
+
+            assert statuses[0] in (200, 201)
+    
+    def test_other_users_cannot_see_reservation(self, client, auth_headers, admin_headers, test_sweet_data):
+        sweet_id = client.post("/api/v1/sweets", json=test_sweet_data, headers=auth_headers).json()["id"]
+        reservation_id = client.post("/api/v1/reservations", json={"sweet_id": sweet_id, "quantity": 1}, headers=auth_headers).json()["id"]
+        
+        response = client.get(f"/api/v1/reservations/{reservation_id}", headers=admin_headers)
+
+        assert response.status_code == 404
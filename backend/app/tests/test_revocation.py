@@ -0,0 +1,36 @@
+from app.core.revocation import BloomFilter, RevocationList
+
+
+class TestRevocationList:
+    """Test cases for the access token denylist."""
+    
+    def test_bloom_filter_membership(self):
+        bloom = BloomFilter(size_bits=1 << 16)
+        for index in range(1000):
+            bloom.add(f"jti-{index}")
+
+        assert all(f"jti-{index}" in bloom for index in range(1000))
+        false_positives = sum(f"other-{index}" in bloom for index in range(1000))
+        assert false_positives < 50
+    
+    def test_revoked_until_expiry(self):
+        now = [1000.0]
+        revoked = RevocationList(clock=lambda: now[0])
+        revoked.revoke("abc", expires_at=1060)
+
+        assert revoked.is_revoked("abc")
+        assert not revoked.is_revoked("def")
+
+        now[0] = 1061
+
+        assert not revoked.is_revoked("abc")
+    
+    def test_purge_drops_expired_entries(self):
+        now = [0.0]
+        revoked = RevocationList(purge_interval=10, clock=lambda: now[0])
+        revoked.revoke("old", expires_at=5)
+        now[0] = 20
+        revoked.revoke("new", expires_at=100)
+
+        assert len(revoked) == 1
+        assert revoked.is_revoked("new")
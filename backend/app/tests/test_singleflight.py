@@ -0,0 +1,90 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.core.singleflight import SingleFlight
+
+
+class TestSingleFlight:
+    """Test cases for coalescing identical concurrent calls."""
+    
+    def test_concurrent_calls_share_one_execution(self):
+        flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+        results = []
+
+        def query():
+            calls.append(1)
+            started.set()
+            release.wait()
+            return ["row"]
+
+        leader = threading.Thread(target=lambda: results.append(flight.do("key", query)))
+        leader.start()
+        started.wait()
+        followers = [threading.Thread(target=lambda: results.append(flight.do("key", query))) for _ in range(10)]
+        for thread in followers:
+            thread.start()
+        while flight.stats()["coalesced"] < 10:
+            time.sleep(0.001)
+        release.set()
+        for thread in [leader, *followers]:
+            thread.join()
+
+        assert len(calls) == 1
+        assert results == [["row"]] * 11
+        assert flight.stats() == {"executions": 1, "coalesced": 10, "in_flight": 0}
+    
+    def test_sequential_calls_execute_again(self):
+        flight = SingleFlight()
+
+        assert flight.do("key", lambda: 1) == 1
+        assert flight.do("key", lambda: 2) == 2
+        assert flight.stats()["executions"] == 2
+    
+    def test_errors_propagate_and_are_not_kept(self):
+        flight = SingleFlight()
+
+        with pytest.raises(ValueError):
+            flight.do("key", lambda: (_ for _ in ()).throw(ValueError("boom")))
+
+        assert flight.do("key", lambda: "ok") == "ok"
+    
+    def test_async_calls_share_one_execution(self):
+        flight = SingleFlight()
+        calls = []
+
+        async def query():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return ["row"]
+
+        async def run():
+            return await asyncio.gather(*(flight.do_async("key", query) for _ in range(10)))
+
+        results = asyncio.run(run())
+
+        assert len(calls) == 1
+        assert results == [["row"]] * 10
+        assert flight.stats() == {"executions": 1, "coalesced": 9, "in_flight": 0}
+
+
+class TestAdminMetrics:
+    """Test cases for the admin metrics endpoint."""
+    
+    def test_metrics_as_admin(self, client, admin_headers):
+        client.get("/api/v1/sweets/search?category=Chocolate", headers=admin_headers)
+        
+        response = client.get("/api/v1/admin/metrics", headers=admin_headers)
+
+        assert response.status_code == 200
+        assert set(response.json()["catalog_singleflight"]) == {"executions", "coalesced", "in_flight"}
+    
+    def test_metrics_as_regular_user(self, client, auth_headers):
+        response = client.get("/api/v1/admin/metrics", headers=auth_headers)
+
+        assert response.status_code == 403
@@ -0,0 +1,109 @@
+import pytest
+from sqlalchemy import create_engine, text
+
+from app.core.slow_queries import SlowQueryLog, fingerprint, normalize_statement, parameter_shape, slow_query_log
+
+
+class TestFingerprints:
+    """Test cases for statement normalization."""
+    
+    def test_literals_and_placeholders_are_normalized(self):
+        assert normalize_statement("SELECT * FROM sweets WHERE id = 5 AND name = 'Fudge'") == \
+            "SELECT * FROM sweets WHERE id = ? AND name = ?"
+        assert normalize_statement("SELECT * FROM sweets\n  WHERE price >= %(price_1)s") == \
+            "SELECT * FROM sweets WHERE price >= ?"
+        assert normalize_statement("SELECT * FROM sweets WHERE id IN (?, ?, ?)") == \
+            "SELECT * FROM sweets WHERE id IN (?+)"
+        assert normalize_statement("SELECT sweets_1.id FROM sweets AS sweets_1") == \
+            "SELECT sweets_1.id FROM sweets AS sweets_1"
+    
+    def test_same_shape_shares_fingerprint(self):
+        assert fingerprint("SELECT * FROM sweets WHERE id IN (1, 2)") == \
+            fingerprint("SELECT  *  FROM sweets WHERE id IN (7, 8, 9, 10)")
+        assert fingerprint("SELECT * FROM sweets WHERE id = 1") != fingerprint("SELECT * FROM users WHERE id = 1")
+    
+    def test_parameter_shape_hides_values(self):
+        assert parameter_shape({"name": "Fudge", "price": 2.5}) == {"name": "str", "price": "float"}
+        assert parameter_shape(("Fudge", 3)) == ["str", "int"]
+        assert parameter_shape([(1,), (2,)], executemany=True) == {"rows": 2, "row": ["int"]}
+
+
+class TestSlowQueryLog:
+    """Test cases for recording slow statements and their plans."""
+    
+    @pytest.fixture
+    def engine(self):
+        engine = create_engine("sqlite://")
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE sweets (id INTEGER PRIMARY KEY, name TEXT, price REAL)"))
+            conn.execute(text("CREATE INDEX ix_sweets_price ON sweets (price)"))
+        yield engine
+        engine.dispose()
+    
+    def test_aggregates_by_fingerprint_and_captures_plan(self, engine):
+        log = SlowQueryLog(threshold_ms=0, explain_sample_rate=0.0)
+        log.install(engine)
+
+        with engine.connect() as conn:
+            for price in (1, 2, 3):
+                conn.execute(text("SELECT * FROM sweets WHERE price > :price"), {"price": price})
+            conn.execute(text("SELECT * FROM sweets WHERE name = 'Fudge'"))
+
+        top = log.top()
+        by_statement = {entry["statement"]: entry for entry in top}
+        ranged = by_statement["SELECT * FROM sweets WHERE price > ?"]
+        assert ranged["count"] == 3
+        assert ranged["parameters"] == ["int"]
+        assert "ix_sweets_price" in ranged["plan"]
+        assert "SCAN" in by_statement["SELECT * FROM sweets WHERE name = ?"]["plan"]
+        assert log.top(order_by="count")[0]["fingerprint"] == ranged["fingerprint"]
+    
+    def test_fast_queries_are_ignored(self, engine):
+        log = SlowQueryLog(threshold_ms=10_000)
+        log.install(engine)
+
+        with engine.connect() as conn:
+            conn.execute(text("SELECT * FROM sweets"))
+
+        assert log.top() == []
+    
+    def test_keeps_most_expensive_fingerprints(self, engine):
+        # Statements take 3, 1 and 2 seconds.
+        ticks = iter([0, 3, 10, 11, 20, 22])
+        log = SlowQueryLog(threshold_ms=0, max_fingerprints=2, clock=lambda: next(ticks))
+        log.install(engine)
+
+        with engine.connect() as conn:
+            for table in ("sqlite_master", "sweets", "sqlite_schema"):
+                conn.execute(text(f"SELECT count(*) FROM {table}"))
+
+        assert [entry["statement"] for entry in log.top()] == [
+            "SELECT count(*) FROM sqlite_master",
+            "SELECT count(*) FROM sqlite_schema",
+        ]
+
+
+class TestSlowQueryEndpoint:
+    """Test cases for the admin slow query report."""
+    
+    def test_admin_sees_slow_queries(self, client, admin_headers, test_sweet_data, monkeypatch):
+        monkeypatch.setattr(slow_query_log, "threshold_ms", 0)
+        slow_query_log.clear()
+        client.post("/api/v1/sweets", json=test_sweet_data, headers=admin_headers)
+        client.get("/api/v1/sweets/search?name=choc", headers=admin_headers)
+
+        response = client.get("/api/v1/admin/slow-queries?order_by=count", headers=admin_headers)
+
+        assert response.status_code == 200
+        statements = [entry["statement"] for entry in response.json()["queries"]]
+        assert any(statement.startswith("INSERT INTO sweets") for statement in statements)
+        assert any("lower(sweets.name) LIKE lower(?)" in statement for statement in statements)
+
+        client.delete("/api/v1/admin/slow-queries", headers=admin_headers)
+        monkeypatch.setattr(slow_query_log, "threshold_ms", 10_000)
+        assert client.get("/api/v1/admin/slow-queries", headers=admin_headers).json()["queries"] == []
+    
+    def test_requires_admin(self, client, auth_headers):
+        response = client.get("/api/v1/admin/slow-queries", headers=auth_headers)
+
+        assert response.status_code == 403
@@ -155,6 +155,124 @@ class TestUpdateSweet:
 
         assert response.status_code == 401
 
+    def test_update_sweet_bumps_version(self, client, auth_headers, test_sweet_data):
+        create_response = client.post("/api/v1/sweets", json=test_sweet_data, headers=auth_headers)
+        sweet_id = create_response.json()["id"]
+
+        assert create_response.json()["version"] == 1
+        assert create_response.headers["etag"] == '"1"'
+
+        response = client.put(f"/api/v1/sweets/{sweet_id}", json={"price": 3.49}, headers=auth_headers)
+
+        assert response.status_code == 200
+        assert response.json()["version"] == 2
+        assert response.headers["etag"] == '"2"'
+    
+    def test_update_sweet_with_matching_if_match(self, client, auth_headers, test_sweet_data):
+        create_response = client.post("/api/v1/sweets", json=test_sweet_data, headers=auth_headers)
+        sweet_id = create_response.json()["id"]
+        etag = create_response.headers["etag"]
+        
+        response = client.put(
+            f"/api/v1/sweets/{sweet_id}",
+            json={"name": "Updated Sweet"},
+            headers={**auth_headers, "If-Match": etag}
+        )
+
+        assert response.status_code == 200
+        assert response.json()["name"] == "Updated Sweet"
+    
+    def test_update_sweet_with_stale_if_match(self, client, auth_headers, test_sweet_data):
+        create_response = client.post("/api/v1/sweets", json=test_sweet_data, headers=auth_headers)
+        sweet_id = create_response.json()["id"]
+        etag = create_response.headers["etag"]
+        client.put(f"/api/v1/sweets/{sweet_id}", json={"price": 4.99}, headers={**auth_headers, "If-Match": etag})
+        
+        response = client.put(
+            f"/api/v1/sweets/{sweet_id}",
+            json={"price": 1.99},
+            headers={**auth_headers, "If-Match": etag}
+        )
+
+        assert response.status_code == 412
+
+        get_response = client.get("/api/v1/sweets", headers=auth_headers)
+
+        assert get_response.json()[0]["price"] == 4.99
+    
+    def test_update_after_purchase_with_stale_if_match(self, client, auth_headers, test_sweet_data):
+        create_response = client.post("/api/v1/sweets", json=test_sweet_data, headers=auth_headers)
+        sweet_id = create_response.json()["id"]
+        etag = create_response.headers["etag"]
+        purchase_response = client.post(
+            f"/api/v1/sweets/{sweet_id}/purchase", json={"quantity": 1}, headers=auth_headers
+        )
+        
+        response = client.put(
+            f"/api/v1/sweets/{sweet_id}",
+            json={"quantity": test_sweet_data["quantity"]},
+            headers={**auth_headers, "If-Match": etag}
+        )
+
+        assert purchase_response.json()["version"] == 2
+        assert response.status_code == 412
+
+        get_response = client.get("/api/v1/sweets", headers=auth_headers)
+
+        assert get_response.json()[0]["quantity"] == test_sweet_data["quantity"] - 1
+    
+    def test_update_nonexistent_sweet_with_if_match(self, client, auth_headers):
+        response = client.put(
+            "/api/v1/sweets/99999",
+            json={"name": "Updated"},
+            headers={**auth_headers, "If-Match": '"1"'}
+        )
+
+        assert response.status_code == 404
+
+
+class TestBulkUpdateSweets:
+    """Test cases for bulk updating sweets."""
+    
+    def test_bulk_update_success(self, client, admin_headers):
+        first = client.post("/api/v1/sweets", json={"name": "Sweet 1", "category": "Cat1", "price": 1.99, "quantity": 10}, headers=admin_headers).json()
+        second = client.post("/api/v1/sweets", json={"name": "Sweet 2", "category": "Cat2", "price": 2.99, "quantity": 20}, headers=admin_headers).json()
+        
+        response = client.patch("/api/v1/sweets", json=[
+            {"id": first["id"], "version": first["version"], "price": 2.49},
+            {"id": second["id"], "version": second["version"], "quantity": 5}
+        ], headers=admin_headers)
+
+        assert response.status_code == 200
+        data = response.json()
+
+        assert [sweet["version"] for sweet in data] == [2, 2]
+        assert data[0]["price"] == 2.49
+        assert data[1]["quantity"] == 5
+    
+    def test_bulk_update_conflict_rolls_back(self, client, admin_headers):
+        first = client.post("/api/v1/sweets", json={"name": "Sweet 1", "category": "Cat1", "price": 1.99, "quantity": 10}, headers=admin_headers).json()
+        second = client.post("/api/v1/sweets", json={"name": "Sweet 2", "category": "Cat2", "price": 2.99, "quantity": 20}, headers=admin_headers).json()
+        client.put(f"/api/v1/sweets/{second['id']}", json={"quantity": 15}, headers=admin_headers)
+        
+        response = client.patch("/api/v1/sweets", json=[
+            {"id": first["id"], "version": first["version"], "price": 2.49},
+            {"id": second["id"], "version": second["version"], "quantity": 5}
+        ], headers=admin_headers)
+
+        assert response.status_code == 412
+
+        sweets = client.get("/api/v1/sweets", headers=admin_headers).json()
+
+        assert sweets[0]["price"] == 1.99
+        assert sweets[0]["version"] == 1
+        assert sweets[1]["quantity"] == 15
+    
+    def test_bulk_update_as_regular_user(self, client, auth_headers):
+        response = client.patch("/api/v1/sweets", json=[], headers=auth_headers)
+
+        assert response.status_code == 403
+
 class TestDeleteSweet:
     """Test cases for deleting sweets."""
     
@@ -233,6 +351,25 @@ class TestRestockSweet:
 
         assert data["quantity"] == initial_quantity + 50
     
+    def test_restock_keeps_concurrent_changes(self, client, db_session, admin_headers, test_sweet_data):
+        from sqlalchemy import text
+
+        from app.models.sweets import Sweet
+
+        sweet_id = client.post("/api/v1/sweets", json=test_sweet_data, headers=admin_headers).json()["id"]
+        # A stale copy in the session, then a purchase committed behind its back.
+        stale = db_session.get(Sweet, sweet_id)
+        db_session.execute(
+            text("UPDATE sweets SET quantity = quantity - 5, version = version + 1 WHERE id = :id"),
+            {"id": sweet_id}
+        )
+        
+        response = client.post(f"/api/v1/sweets/{sweet_id}/restock", json={"quantity": 50}, headers=admin_headers)
+
+        assert response.json()["quantity"] == test_sweet_data["quantity"] + 45
+        assert response.json()["version"] == 3
+        assert stale.quantity == test_sweet_data["quantity"] + 45
+    
     def test_restock_sweet_as_regular_user(self, client, auth_headers, test_sweet_data):
         create_response = client.post("/api/v1/sweets", json=test_sweet_data, headers=auth_headers)
         sweet_id = create_response.json()["id"]
@@ -252,4 +389,104 @@ class TestRestockSweet:
         
         response = client.post(f"/api/v1/sweets/{sweet_id}/restock", json={"quantity": -10}, headers=admin_headers)
 
-        assert response.status_code == 422
\ No newline at end of file
+        assert response.status_code == 422
+
+class TestBulkRestock:
+    """Test cases for restocking many sweets at once."""
+    
+    def seed(self, client, headers):
+        sweets = [
+            {"name": "Milk Chocolate", "category": "Chocolate", "price": 1.50, "quantity": 10},
+            {"name": "Dark Chocolate", "category": "Chocolate", "price": 2.75, "quantity": 20},
+            {"name": "Gummy Bears", "category": "Gummy", "price": 0.99, "quantity": 30},
+        ]
+        return [client.post("/api/v1/sweets", json=sweet, headers=headers).json()["id"] for sweet in sweets]
+    
+    def test_bulk_restock_in_chunks(self, client, admin_headers, monkeypatch):
+        from app.api.routes import sweets
+
+        monkeypatch.setattr(sweets, "BULK_CHUNK_SIZE", 2)
+        first, second, third = self.seed(client, admin_headers)
+        
+        response = client.post("/api/v1/sweets/restock", json={"items": [
+            {"sweet_id": first, "quantity": 5},
+            {"sweet_id": third, "quantity": 7},
+            {"sweet_id": first, "quantity": 1},
+            {"sweet_id": 99999, "quantity": 3}
+        ]}, headers=admin_headers)
+
+        assert response.status_code == 200
+        assert response.json() == {"updated": 2, "not_found": [99999]}
+
+        quantities = {sweet["id"]: sweet["quantity"] for sweet in client.get("/api/v1/sweets", headers=admin_headers).json()}
+
+        assert quantities == {first: 16, second: 20, third: 37}
+    
+    def test_bulk_restock_as_regular_user(self, client, auth_headers):
+        response = client.post("/api/v1/sweets/restock", json={"items": [{"sweet_id": 1, "quantity": 5}]}, headers=auth_headers)
+
+        assert response.status_code == 403
+    
+    def test_bulk_restock_invalid_quantity(self, client, admin_headers):
+        response = client.post("/api/v1/sweets/restock", json={"items": [{"sweet_id": 1, "quantity": 0}]}, headers=admin_headers)
+
+        assert response.status_code == 422
+
+
+class TestAdjustPrices:
+    """Test cases for bulk price adjustments."""
+    
+    seed = TestBulkRestock.seed
+    
+    def test_adjust_prices_by_percent_for_category(self, client, admin_headers, monkeypatch):
+        from app.api.routes import sweets
+
+        monkeypatch.setattr(sweets, "BULK_CHUNK_SIZE", 1)
+        first, second, third = self.seed(client, admin_headers)
+        
+        response = client.post(
+            "/api/v1/sweets/prices", json={"category": "chocolate", "percent": 10}, headers=admin_headers
+        )
+
+        assert response.status_code == 200
+        assert response.json() == {"updated": 2, "skipped": 0}
+
+        catalog = {sweet["id"]: sweet for sweet in client.get("/api/v1/sweets", headers=admin_headers).json()}
+
+        assert catalog[first]["price"] == 1.65
+        assert catalog[second]["price"] == 3.03
+        assert catalog[third]["price"] == 0.99
+        assert [catalog[sweet_id]["version"] for sweet_id in (first, second, third)] == [2, 2, 1]
+
+        history = client.get(f"/api/v1/sweets/{first}/prices", headers=admin_headers).json()
+
+        assert [entry["price"] for entry in history] == [1.50, 1.65]
+        assert history[0]["effective_to"] == history[1]["effective_from"]
+    
+    def test_adjust_prices_by_amount_skips_non_positive(self, client, admin_headers):
+        first, second, third = self.seed(client, admin_headers)
+        
+        response = client.post(
+            "/api/v1/sweets/prices", json={"max_price": 2, "amount": -1.25}, headers=admin_headers
+        )
+
+        assert response.json() == {"updated": 1, "skipped": 1}
+
+        catalog = {sweet["id"]: sweet for sweet in client.get("/api/v1/sweets", headers=admin_headers).json()}
+
+        assert catalog[first]["price"] == 0.25
+        assert catalog[third]["price"] == 0.99
+    
+    def test_adjust_prices_requires_filter_and_single_adjustment(self, client, admin_headers):
+        no_filter = client.post("/api/v1/sweets/prices", json={"percent": 5}, headers=admin_headers)
+        both = client.post(
+            "/api/v1/sweets/prices", json={"sweet_ids": [1], "percent": 5, "amount": 1}, headers=admin_headers
+        )
+
+        assert no_filter.status_code == 422
+        assert both.status_code == 422
+    
+    def test_adjust_prices_as_regular_user(self, client, auth_headers):
+        response = client.post("/api/v1/sweets/prices", json={"sweet_ids": [1], "percent": 5}, headers=auth_headers)
+
+        assert response.status_code == 403
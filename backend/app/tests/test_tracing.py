@@ -0,0 +1,113 @@
+import pytest
+
+from app.core.tracing import Tracer, _current_span, span, traced, tracer
+
+
+class CollectingExporter:
+    def __init__(self):
+        self.spans = []
+    
+    def export(self, spans):
+        self.spans.extend(span.to_dict() for span in spans)
+
+
+@traced("outer", stage="auth")
+def outer():
+    return inner()
+
+
+@traced("inner", stage="auth")
+def inner():
+    return 42
+
+
+class TestTracer:
+    """Test cases for spans, stages and sampling."""
+    
+    def test_nested_spans_share_trace(self):
+        exporter = CollectingExporter()
+        local_tracer = Tracer(exporter=exporter)
+        root = local_tracer.start_trace("request")
+
+        token = _current_span.set(root)
+        try:
+            assert outer() == 42
+            with span("work", stage="db", table="sweets"):
+                pass
+        finally:
+            _current_span.reset(token)
+        local_tracer.finish_trace(root)
+
+        by_name = {item["name"]: item for item in exporter.spans}
+        assert set(by_name) == {"request", "outer", "inner", "work"}
+        assert {item["traceId"] for item in exporter.spans} == {root.trace.trace_id}
+        assert by_name["inner"]["parentSpanId"] == by_name["outer"]["spanId"]
+        assert by_name["work"]["attributes"] == {"table": "sweets"}
+        assert by_name["request"]["kind"] == "SERVER"
+        # The inner auth span is covered by the outer one.
+        assert {stage: count for stage, (_, count) in root.trace.stage_timings().items()} == {"auth": 1, "db": 1}
+    
+    def test_traced_function_without_trace_is_plain_call(self):
+        assert outer() == 42
+    
+    def test_sampling(self):
+        assert Tracer(sample_rate=0.0).start_trace("request") is None
+        assert Tracer(sample_rate=1.0).start_trace("request") is not None
+        assert Tracer(enabled=False).start_trace("request") is None
+    
+    def test_traceparent_decides_sampling(self):
+        local_tracer = Tracer(sample_rate=0.0)
+        trace_id = "4bf92f3577b34da6a3ce929d0e0e4736"
+
+        sampled = local_tracer.start_trace("request", f"00-{trace_id}-00f067aa0ba902b7-01")
+        dropped = Tracer(sample_rate=1.0).start_trace("request", f"00-{trace_id}-00f067aa0ba902b7-00")
+
+        assert sampled.trace.trace_id == trace_id
+        assert sampled.parent_span_id == "00f067aa0ba902b7"
+        assert dropped is None
+
+
+class TestRequestTracing:
+    """Test cases for traced requests and Server-Timing headers."""
+    
+    @pytest.fixture
+    def exporter(self, monkeypatch):
+        exporter = CollectingExporter()
+        monkeypatch.setattr(tracer, "enabled", True)
+        monkeypatch.setattr(tracer, "sample_rate", 1.0)
+        monkeypatch.setattr(tracer, "exporter", exporter)
+        return exporter
+    
+    def test_purchase_is_traced_by_stage(self, client, auth_headers, test_sweet_data, exporter):
+        sweet_id = client.post("/api/v1/sweets", json=test_sweet_data, headers=auth_headers).json()["id"]
+        exporter.spans.clear()
+
+        response = client.post(f"/api/v1/sweets/{sweet_id}/purchase", json={"quantity": 1}, headers=auth_headers)
+
+        assert response.status_code == 200
+        stages = {entry.split(";")[0] for entry in response.headers["Server-Timing"].split(", ")}
+        assert {"auth", "db", "commit", "total"} <= stages
+
+        names = [item["name"] for item in exporter.spans]
+        root = next(item for item in exporter.spans if item["kind"] == "SERVER")
+        assert root["name"] == f"POST /api/v1/sweets/{sweet_id}/purchase"
+        assert root["attributes"]["code.function"] == "purchase_sweet"
+        assert root["attributes"]["http.status_code"] == 200
+        assert "deps.get_current_user" in names
+        assert "security.decode_access_token" in names
+        assert "db UPDATE" in names
+        assert "db.commit" in names
+        statements = [item for item in exporter.spans if item["name"] == "db UPDATE"]
+        assert statements[0]["attributes"]["db.statement"].startswith("UPDATE sweets")
+    
+    def test_failed_auth_marks_span_as_error(self, client, exporter):
+        response = client.get("/api/v1/sweets", headers={"Authorization": "Bearer not-a-token"})
+
+        assert response.status_code == 401
+        claims = next(item for item in exporter.spans if item["name"] == "deps.get_token_claims")
+        assert claims["status"]["code"] == "ERROR"
+    
+    def test_no_header_when_disabled(self, client, auth_headers):
+        response = client.get("/api/v1/sweets", headers=auth_headers)
+
+        assert "Server-Timing" not in response.headers
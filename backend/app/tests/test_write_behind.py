@@ -0,0 +1,150 @@
+import threading
+
+import pytest
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import sessionmaker
+
+from app.api.routes.orders import record_orders
+from app.core.database import Base
+from app.core.write_behind import InsufficientStock, PurchaseBatcher, SweetNotFound
+from app.models.orders import Order, OrderLine
+from app.models.sweets import Sweet
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'write_behind.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    db = factory()
+    db.add(Sweet(id=1, name="Hot Fudge", category="Chocolate", price=2.5, quantity=150))
+    db.commit()
+    db.close()
+    yield factory
+    engine.dispose()
+
+
+class TestPurchaseBatcher:
+    """Test cases for write-behind purchase batching."""
+    
+    def test_concurrent_purchases_are_group_committed(self, session_factory):
+        batcher = PurchaseBatcher(session_factory, flush_interval=0.005, record_orders=record_orders)
+        succeeded = []
+        rejected = []
+
+        def worker(user_id):
+            for _ in range(10):
+                try:
+                    batcher.purchase(user_id, 1, 1)
+                    succeeded.append(1)
+                except InsufficientStock:
+                    rejected.append(1)
+
+        threads = [threading.Thread(target=worker, args=(user_id,)) for user_id in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        batcher.close()
+
+        assert len(succeeded) == 150
+        assert len(rejected) == 50
+        assert batcher.stats()["flushes"] < 150
+
+        db = session_factory()
+        assert db.get(Sweet, 1).quantity == 0
+        assert db.get(Sweet, 1).version == 151
+        assert db.query(func.count(Order.id)).scalar() == 150
+        assert db.query(func.sum(OrderLine.quantity)).scalar() == 150
+        db.close()
+    
+    def test_purchase_returns_snapshot_after_commit(self, session_factory):
+        batcher = PurchaseBatcher(session_factory, flush_interval=0)
+        
+        snapshot = batcher.purchase(7, 1, 5)
+        batcher.close()
+
+        assert snapshot.quantity == 145
+        assert snapshot.version == 2
+        db = session_factory()
+        assert db.get(Sweet, 1).quantity == 145
+        assert db.get(Sweet, 1).version == 2
+        db.close()
+    
+    def test_available_counts_buffered_purchases(self, session_factory):
+        batcher = PurchaseBatcher(session_factory, flush_interval=0.05)
+        
+        pending = batcher.enqueue(7, 1, 5)
+        available = batcher.available(1)
+        batcher.wait(pending)
+        batcher.close()
+
+        assert available == 145
+        assert batcher.available(1) == 145
+    
+    def test_holds_and_missing_sweets(self, session_factory):
+        batcher = PurchaseBatcher(session_factory, flush_interval=0)
+
+        with pytest.raises(InsufficientStock):
+            batcher.purchase(7, 1, 10, held=145)
+        with pytest.raises(SweetNotFound):
+            batcher.purchase(7, 2, 1)
+    
+    def test_invalidate_reloads_external_changes(self, session_factory):
+        batcher = PurchaseBatcher(session_factory, flush_interval=0)
+        batcher.purchase(7, 1, 50)
+        db = session_factory()
+        db.get(Sweet, 1).quantity += 100
+        db.commit()
+        db.close()
+        
+        batcher.invalidate(1)
+        snapshot = batcher.purchase(7, 1, 150)
+        batcher.close()
+
+        assert snapshot.quantity == 50
+    
+    def test_failed_flush_fails_the_batch(self, session_factory):
+        batcher = PurchaseBatcher(session_factory, flush_interval=0)
+        batcher.purchase(7, 1, 1)
+        db = session_factory()
+        db.get(Sweet, 1).quantity = 0
+        db.commit()
+        db.close()
+
+        with pytest.raises(InsufficientStock):
+            batcher.purchase(7, 1, 10)
+        batcher.close()
+
+        assert batcher.stats()["counters"] == 0
+
+
+class TestWriteBehindPurchaseEndpoint:
+    """Test cases for purchases routed through the batcher."""
+    
+    def test_purchase_with_write_behind_enabled(self, client, db_session, auth_headers, test_sweet_data, monkeypatch):
+        from app.api.routes import sweets
+
+        monkeypatch.setattr(sweets.settings, "purchase_write_behind", True)
+        monkeypatch.setattr(sweets.purchase_batcher, "session_factory", sessionmaker(bind=db_session.get_bind()))
+        sweet_id = client.post("/api/v1/sweets", json=test_sweet_data, headers=auth_headers).json()["id"]
+        
+        response = client.post(f"/api/v1/sweets/{sweet_id}/purchase", json={"quantity": 5}, headers=auth_headers)
+        too_many = client.post(f"/api/v1/sweets/{sweet_id}/purchase", json={"quantity": 1000}, headers=auth_headers)
+        sweets.purchase_batcher.invalidate(sweet_id)
+
+        assert response.status_code == 200
+        assert response.json()["quantity"] == test_sweet_data["quantity"] - 5
+        assert too_many.status_code == 400
+        assert client.get("/api/v1/orders", headers=auth_headers).json()["items"][0]["lines"][0]["quantity"] == 5
+    
+    def test_reservations_see_buffered_purchases(self, client, db_session, auth_headers, test_sweet_data, monkeypatch):
+        from app.api.routes import sweets
+
+        monkeypatch.setattr(sweets.settings, "purchase_write_behind", True)
+        monkeypatch.setattr(sweets.purchase_batcher, "available", lambda sweet_id: 2)
+        sweet_id = client.post("/api/v1/sweets", json=test_sweet_data, headers=auth_headers).json()["id"]
+        
+        response = client.post("/api/v1/reservations", json={"sweet_id": sweet_id, "quantity": 3}, headers=auth_headers)
+
+        assert response.status_code == 400
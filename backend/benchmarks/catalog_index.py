@@ -0,0 +1,82 @@
+"""Search latency: SQL filters versus the in-memory catalog index.
+
+Usage: python -m benchmarks.catalog_index [--rows 100000] [--database-url URL]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.api.routes.sweets import _filter_sweets
+from app.core.catalog_index import CatalogIndex
+from app.core.database import Base
+from app.models.sweets import Sweet
+from app.schemas.sweets import SweetResponse
+from benchmarks.facets import seed
+
+QUERIES = [
+    {"name": "sweet 1234"},
+    {"category": "toffee"},
+    {"min_price": 4.0, "max_price": 4.5},
+    {"name": "99", "category": "gum", "max_price": 10.0},
+]
+
+
+def sql_search(db, params):
+    query, _ = _filter_sweets(
+        db.query(Sweet),
+        params.get("name"),
+        params.get("category"),
+        params.get("min_price"),
+        params.get("max_price"),
+        None
+    )
+    return [SweetResponse.model_validate(sweet) for sweet in query.all()]
+
+
+def index_search(index, params):
+    return index.search(**params)
+
+
+def timed(fn, *args, rounds=5):
+    best = float("inf")
+    for _ in range(rounds):
+        started = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--database-url")
+    args = parser.parse_args()
+
+    database_url = args.database_url or f"sqlite:///{os.path.join(tempfile.gettempdir(), 'catalog_index_bench.db')}"
+    engine = create_engine(database_url)
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine)
+    seed(session_factory, args.rows)
+
+    db = session_factory()
+    started = time.perf_counter()
+    index = CatalogIndex()
+    index.rebuild(db.query(Sweet).all())
+    print(f"rows: {args.rows}, index build: {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    for params in QUERIES:
+        sql_rows = sql_search(db, params)
+        index_rows = index_search(index, params)
+        assert [row.id for row in sql_rows] == [row["id"] for row in index_rows], params
+        print(f"{params} ({len(index_rows)} rows)")
+        print(f"  sql:   {timed(sql_search, db, params):9.2f} ms")
+        print(f"  index: {timed(index_search, index, params):9.2f} ms")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
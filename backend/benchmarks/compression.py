@@ -0,0 +1,50 @@
+"""Bytes on the wire and CPU cost per catalog response for each encoding.
+
+Usage: python -m benchmarks.compression [number_of_sweets ...]
+"""
+import json
+import random
+import sys
+import time
+
+from app.core.compression import COMPRESSORS
+
+
+def build_catalog(size: int) -> bytes:
+    rng = random.Random(42)
+    categories = ["Chocolate", "Gummy", "Hard Candy", "Toffee", "Lollipop", "Marshmallow"]
+    sweets = [
+        {
+            "name": f"{rng.choice(['Milk', 'Dark', 'Sour', 'Sugar-free'])} {rng.choice(categories)} #{index}",
+            "category": rng.choice(categories),
+            "price": round(rng.uniform(0.5, 20), 2),
+            "quantity": rng.randint(0, 500),
+            "id": index,
+            "version": rng.randint(1, 5),
+        }
+        for index in range(1, size + 1)
+    ]
+    return json.dumps(sweets).encode()
+
+
+def measure(encoding: str, payload: bytes, rounds: int) -> tuple:
+    started = time.process_time()
+    for _ in range(rounds):
+        compressed = COMPRESSORS[encoding]().finish(payload)
+    cpu_ms = (time.process_time() - started) * 1000 / rounds
+    return len(compressed), cpu_ms
+
+
+def main(sizes):
+    print(f"{'sweets':>8} {'encoding':>8} {'bytes':>10} {'ratio':>7} {'cpu ms':>8}")
+    for size in sizes:
+        payload = build_catalog(size)
+        rounds = max(1, 2000 // size)
+        print(f"{size:>8} {'identity':>8} {len(payload):>10} {1.0:>7.2f} {0.0:>8.3f}")
+        for encoding in COMPRESSORS:
+            wire_bytes, cpu_ms = measure(encoding, payload, rounds)
+            print(f"{size:>8} {encoding:>8} {wire_bytes:>10} {len(payload) / wire_bytes:>7.2f} {cpu_ms:>8.3f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10, 100, 1000, 10000])
@@ -0,0 +1,90 @@
+"""Faceted search cost: one grouped query versus one query per facet value.
+
+Usage: python -m benchmarks.facets [--rows 1000000] [--bucket-size 1] [--database-url URL]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from sqlalchemy import create_engine, func, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.api.routes.sweets import compute_facets
+from app.core.database import Base
+from app.models.sweets import Sweet
+
+CATEGORIES = ["Chocolate", "Gummy", "Hard Candy", "Toffee", "Lollipop", "Marshmallow", "Fudge", "Licorice"]
+
+
+def seed(session_factory, rows: int):
+    rng = random.Random(42)
+    db = session_factory()
+    if db.query(func.count(Sweet.id)).scalar() != rows:
+        db.query(Sweet).delete()
+        for start in range(0, rows, 50_000):
+            db.execute(insert(Sweet), [
+                {
+                    "name": f"Sweet {index}",
+                    "category": rng.choice(CATEGORIES),
+                    "price": round(rng.uniform(0.5, 20), 2),
+                    "quantity": rng.randint(0, 500),
+                }
+                for index in range(start, min(start + 50_000, rows))
+            ])
+        db.commit()
+    db.close()
+
+
+def grouped(db, bucket_size):
+    return compute_facets(db.query(Sweet), Sweet.price, bucket_size)
+
+
+def per_value(db, bucket_size):
+    categories = {
+        category: db.query(func.count(Sweet.id)).filter(Sweet.category == category).scalar()
+        for category in CATEGORIES
+    }
+    highest = db.query(func.max(Sweet.price)).scalar()
+    buckets = {}
+    bucket = 0
+    while bucket * bucket_size <= highest:
+        buckets[bucket] = db.query(func.count(Sweet.id)).filter(
+            Sweet.price >= bucket * bucket_size, Sweet.price < (bucket + 1) * bucket_size
+        ).scalar()
+        bucket += 1
+    return categories, buckets
+
+
+def timed(fn, *args, rounds=3):
+    best = float("inf")
+    for _ in range(rounds):
+        started = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--bucket-size", type=float, default=1.0)
+    parser.add_argument("--database-url")
+    args = parser.parse_args()
+
+    database_url = args.database_url or f"sqlite:///{os.path.join(tempfile.gettempdir(), 'facets_bench.db')}"
+    engine = create_engine(database_url)
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine)
+    seed(session_factory, args.rows)
+
+    db = session_factory()
+    print(f"rows: {args.rows}")
+    print(f"  grouped query: {timed(grouped, db, args.bucket_size):9.1f} ms")
+    print(f"  per-value queries: {timed(per_value, db, args.bucket_size):9.1f} ms")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Purchases per second on a single hot sweet, with and without write-behind.
+
+"row-per-commit" mirrors the default purchase path: one conditional UPDATE,
+one order and one commit per purchase. "write-behind" routes the same
+purchases through PurchaseBatcher, which group-commits them.
+
+Usage: python -m benchmarks.hot_item_purchases [--threads 16] [--purchases 2000] [--database-url URL]
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import sessionmaker
+
+from app.api.routes.orders import record_order, record_orders
+from app.core.database import Base
+from app.core.write_behind import PurchaseBatcher
+from app.models.orders import Order, OrderLine
+from app.models.sweets import Sweet
+from app.models.user import User
+
+
+def reset(session_factory, stock: int):
+    db = session_factory()
+    db.query(OrderLine).delete()
+    db.query(Order).delete()
+    db.query(Sweet).delete()
+    db.query(User).filter(User.id == 1).delete()
+    db.add(User(id=1, email="bench@example.com", full_name="Bench", hashed_password="x"))
+    db.add(Sweet(id=1, name="Hot Fudge", category="Chocolate", price=2.5, quantity=stock))
+    db.commit()
+    db.close()
+
+
+def purchase_row_per_commit(session_factory):
+    def purchase():
+        db = session_factory()
+        try:
+            sweet = db.execute(
+                update(Sweet)
+                .where(Sweet.id == 1, Sweet.quantity >= 1)
+                .values(quantity=Sweet.quantity - 1)
+                .returning(Sweet)
+            ).scalar_one()
+            record_order(db, 1, [(sweet, 1)])
+            db.commit()
+        finally:
+            db.close()
+    return purchase, None
+
+
+def purchase_write_behind(session_factory):
+    batcher = PurchaseBatcher(session_factory, flush_interval=0.002, record_orders=record_orders)
+    return (lambda: batcher.purchase(1, 1, 1)), batcher
+
+
+def run(session_factory, strategy, threads: int, purchases: int) -> float:
+    reset(session_factory, purchases)
+    purchase, batcher = strategy(session_factory)
+    per_thread = purchases // threads
+
+    def worker():
+        for _ in range(per_thread):
+            purchase()
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    if batcher is not None:
+        batcher.close()
+    return per_thread * threads / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--purchases", type=int, default=2000)
+    parser.add_argument("--database-url")
+    args = parser.parse_args()
+
+    database_url = args.database_url
+    if database_url is None:
+        database_url = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'hot_item.db')}"
+    engine = create_engine(database_url, pool_size=args.threads, max_overflow=0)
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    for name, strategy in (("row-per-commit", purchase_row_per_commit), ("write-behind", purchase_write_behind)):
+        rate = run(session_factory, strategy, args.threads, args.purchases)
+        print(f"{name:>15}: {rate:10.0f} purchases/sec")
+
+
+if __name__ == "__main__":
+    main()
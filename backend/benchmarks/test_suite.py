@@ -0,0 +1,66 @@
+"""Wall time of the test suite, optionally recorded for tracking over time.
+
+Usage: python -m benchmarks.test_suite [--rounds 3] [--workers N] [--record benchmarks/test_suite.jsonl]
+
+--workers runs the suite with pytest-xdist (``-n N``); 0 runs it serially.
+"""
+import argparse
+import json
+import re
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+
+def run_suite(workers: int):
+    command = [sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider", "--color=no", "app/tests"]
+    if workers:
+        command += ["-n", str(workers)]
+    started = time.perf_counter()
+    result = subprocess.run(command, capture_output=True, text=True)
+    elapsed = time.perf_counter() - started
+    summary = result.stdout.strip().splitlines()[-1] if result.stdout.strip() else ""
+    if result.returncode != 0:
+        sys.exit(f"test suite failed: {summary}")
+    passed = re.search(r"(\d+) passed", summary)
+    return elapsed, int(passed.group(1)) if passed else 0
+
+
+def current_commit() -> str:
+    result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True)
+    return result.stdout.strip()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=0)
+    parser.add_argument("--record")
+    args = parser.parse_args()
+
+    timings = []
+    tests = 0
+    for _ in range(args.rounds):
+        elapsed, tests = run_suite(args.workers)
+        timings.append(elapsed)
+
+    print(f"tests: {tests}, workers: {args.workers or 'serial'}")
+    print(f"  best:   {min(timings):7.2f} s")
+    print(f"  median: {statistics.median(timings):7.2f} s")
+
+    if args.record:
+        with open(args.record, "a") as record:
+            record.write(json.dumps({
+                "recorded_at": datetime.now(timezone.utc).isoformat(),
+                "commit": current_commit(),
+                "workers": args.workers,
+                "tests": tests,
+                "best_seconds": round(min(timings), 3),
+                "median_seconds": round(statistics.median(timings), 3),
+            }) + "\n")
+
+
+if __name__ == "__main__":
+    main()